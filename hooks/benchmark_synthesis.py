@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark Synthesis - Throughput of loading and archiving finding files
+Compares the serial loop against the concurrent loader at several directory sizes
+"""
+
+import argparse
+import json
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from synthesize_agent_findings import AgentFindingsSynthesizer
+
+
+def write_findings(findings_dir: Path, count: int):
+    """Synthetic findings shaped like extract_finding_from_output's"""
+    findings_dir.mkdir(parents=True, exist_ok=True)
+    for i in range(count):
+        finding = {
+            'task_id': f"task_{i}",
+            'timestamp': '2025-01-01T00:00:00',
+            'patterns': [{'type': 'detected', 'content': f"Found pattern {i % 20} in handler"}],
+            'issues': [{'type': 'identified', 'content': f"Warning: issue {i % 30} in parser"}],
+            'solutions': [{'type': 'applied', 'content': f"Fixed issue {i % 30} with guard"}],
+            'insights': {'summary': f"Agent {i} reviewed module {i % 50}", 'length': 1000 + i}
+        }
+        with open(findings_dir / f"task_{i}.json", 'w') as f:
+            json.dump(finding, f, indent=2)
+
+
+def load_serial(paths: List[Path]) -> List[Dict]:
+    """The original one-file-at-a-time loop"""
+    findings = []
+    for path in paths:
+        with open(path, 'r') as f:
+            findings.append(json.load(f))
+    return findings
+
+
+def serial_archive(paths: List[Path], archive_dir: Path):
+    archive_dir.mkdir(exist_ok=True)
+    for path in paths:
+        path.rename(archive_dir / path.name)
+
+
+def benchmark(count: int) -> Dict:
+    """Seconds and files/s for each step at one directory size"""
+    root = Path(tempfile.mkdtemp(prefix='synthesis_bench_'))
+    try:
+        synthesizer = AgentFindingsSynthesizer(str(root), use_serena=False)
+        write_findings(synthesizer.temp_findings, count)
+        paths = sorted(synthesizer.temp_findings.glob("*.json"))
+        load_serial(paths)  # Warm the page cache so both loaders read from memory
+
+        timings = {}
+        started = time.perf_counter()
+        load_serial(paths)
+        timings['load_serial'] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        loaded = synthesizer.load_json_files(paths)
+        timings['load_concurrent'] = time.perf_counter() - started
+        assert len(loaded) == count
+
+        started = time.perf_counter()
+        serial_archive(paths, root / 'archive_serial')
+        timings['archive_serial'] = time.perf_counter() - started
+
+        moved = sorted((root / 'archive_serial').glob("*.json"))
+        started = time.perf_counter()
+        synthesizer.archive_files(moved, root / 'archive_concurrent')
+        timings['archive_concurrent'] = time.perf_counter() - started
+
+        return {step: {'seconds': round(seconds, 3), 'files_per_s': int(count / seconds) if seconds else 0}
+                for step, seconds in timings.items()}
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark findings load and archive throughput')
+    parser.add_argument('--sizes', default='1000,10000,100000',
+                        help='Comma-separated finding counts')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    results = {}
+    for count in (int(size) for size in args.sizes.split(',') if size):
+        results[count] = benchmark(count)
+        if not args.json:
+            print(f"📦 {count:,} findings")
+            for step, figures in results[count].items():
+                print(f"   • {step}: {figures['seconds']}s ({figures['files_per_s']:,} files/s)")
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Change Point - CUSUM step-change detection with bootstrap confidence
+Finds where a series shifted level, by how much, and how sure we are
+"""
+
+import random
+from typing import Dict, List, Optional
+
+
+def detect_change_point(values: List[float], bootstraps: int = 500,
+                        min_points: int = 8, seed: int = 0) -> Optional[Dict]:
+    """Most likely single step change in values (CUSUM range with bootstrap confidence)
+
+    Returns index (first point of the new level), before/after means,
+    change_percent and confidence in [0, 1], or None for too few points.
+    """
+    n = len(values)
+    if n < min_points:
+        return None
+
+    mean = sum(values) / n
+    span, index = _cusum(values, mean)
+    if span == 0:
+        return None
+
+    # Confidence: how often a random reordering shows a smaller CUSUM range
+    rng = random.Random(seed)
+    shuffled = list(values)
+    smaller = 0
+    for _ in range(bootstraps):
+        rng.shuffle(shuffled)
+        if _cusum(shuffled, mean)[0] < span:
+            smaller += 1
+
+    before = values[:index]
+    after = values[index:]
+    before_mean = sum(before) / len(before)
+    after_mean = sum(after) / len(after)
+
+    return {
+        'index': index,
+        'before_mean': round(before_mean, 2),
+        'after_mean': round(after_mean, 2),
+        'change_percent': round((after_mean - before_mean) / before_mean * 100, 1) if before_mean else 0,
+        'confidence': round(smaller / bootstraps, 3)
+    }
+
+
+def _cusum(values: List[float], mean: float):
+    """(max - min of the cumulative deviation, index after the extreme point)"""
+    total = 0.0
+    high = low = 0.0
+    extreme, index = 0.0, 0
+    for i, value in enumerate(values):
+        total += value - mean
+        high = max(high, total)
+        low = min(low, total)
+        if abs(total) > extreme and i < len(values) - 1:
+            extreme, index = abs(total), i + 1
+    return high - low, index
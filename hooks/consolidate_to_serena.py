@@ -1,23 +1,287 @@
 #!/usr/bin/env python3
-"""Consolidates temp data to Serena MCP memory"""
+"""Consolidates temp data to Serena MCP memory
+
+Saves go over one long-lived stdio JSON-RPC connection to the Serena MCP
+server instead of a new `npx` process and handshake per record.
+"""
 import json
+import os
+import shlex
+import subprocess
 import sys
+import threading
+from concurrent.futures import Future
 from pathlib import Path
-import subprocess
+from typing import Any, Dict, List, Optional, Tuple
+
+# Command that starts the MCP server speaking newline-delimited JSON-RPC on stdio
+SERENA_MCP_COMMAND = os.environ.get(
+    'SERENA_MCP_COMMAND', 'uvx --from git+https://github.com/oraios/serena serena start-mcp-server')
+SAVE_TOOL = os.environ.get('SERENA_SAVE_TOOL', 'save_memory')
+REQUEST_TIMEOUT = float(os.environ.get('SERENA_MCP_TIMEOUT', '30'))
+PROTOCOL_VERSION = '2024-11-05'
+
+
+class MCPError(Exception):
+    """The server answered a request with a JSON-RPC error"""
+
+
+class MCPClient:
+    """One persistent MCP session over a child process's stdin/stdout
+
+    Requests are pipelined: every call is written immediately and a reader
+    thread matches responses to callers by id, so a batch of calls costs one
+    round trip. A dead connection is restarted (with a fresh handshake) and
+    the failed batch retried once.
+    """
+
+    def __init__(self, command=None, timeout: float = REQUEST_TIMEOUT):
+        command = command or SERENA_MCP_COMMAND
+        self.command = shlex.split(command) if isinstance(command, str) else list(command)
+        self.timeout = timeout
+        self.process: Optional[subprocess.Popen] = None
+        self.pending: Dict[int, Future] = {}
+        self.next_id = 0
+        self.lock = threading.Lock()        # Guards pending and next_id
+        self.write_lock = threading.Lock()  # Never held while waiting on pending
+        self.connect_lock = threading.Lock()
+        self.server_info: Dict = {}
+
+    def connect(self):
+        """Start the server and complete the initialize handshake"""
+        self.close()
+        self.process = subprocess.Popen(self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        stderr=subprocess.DEVNULL)
+        threading.Thread(target=self._read_responses, args=(self.process,), daemon=True).start()
+
+        try:
+            result = self._send('initialize', {
+                'protocolVersion': PROTOCOL_VERSION,
+                'capabilities': {},
+                'clientInfo': {'name': 'claude-hooks', 'version': '1.0'}
+            }).result(self.timeout)
+            self.server_info = result.get('serverInfo', {})
+            self._write({'jsonrpc': '2.0', 'method': 'notifications/initialized'})
+        except BaseException:
+            self.close()  # Don't leave a half-initialized server running
+            raise
+
+    def call_tools(self, calls: List[Tuple[str, Dict]]) -> List[Any]:
+        """Run (tool, arguments) calls in one pipelined round; results in call order"""
+        for attempt in range(2):
+            with self.connect_lock:
+                if not self.connected():
+                    self.connect()
+                process = self.process
+            try:
+                futures = [self._send('tools/call', {'name': name, 'arguments': arguments})
+                           for name, arguments in calls]
+                results = [future.result(self.timeout) for future in futures]
+            except MCPError:
+                raise
+            except Exception:
+                # Restart only the connection this batch used, not one another thread just opened
+                with self.connect_lock:
+                    if self.process is process:
+                        self.close()
+                if attempt:
+                    raise
+                continue
+
+            # A tool failure is a successful JSON-RPC response flagged isError
+            for (name, _), result in zip(calls, results):
+                if isinstance(result, dict) and result.get('isError'):
+                    raise MCPError(f"{name} failed: {tool_text(result) or 'tool error'}")
+            return results
+        return []
+
+    def call_tool(self, name: str, arguments: Dict) -> Any:
+        return self.call_tools([(name, arguments)])[0]
+
+    def save_many(self, items: List[Tuple[str, str, Any]]) -> List[Any]:
+        """Save (namespace, key, data) items in one round of calls"""
+        return self.call_tools([(SAVE_TOOL, {'namespace': namespace, 'key': key, 'data': data})
+                                for namespace, key, data in items])
+
+    def connected(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def close(self):
+        """Stop the server and fail anything still waiting on it"""
+        process, self.process = self.process, None
+        if process is not None:
+            try:
+                process.stdin.close()
+                process.wait(timeout=2)
+            except Exception:
+                process.kill()
+
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError('MCP connection closed'))
+
+    def _send(self, method: str, params: Dict) -> Future:
+        future = Future()
+        with self.lock:
+            self.next_id += 1
+            request_id = self.next_id
+            self.pending[request_id] = future
+        self._write({'jsonrpc': '2.0', 'id': request_id, 'method': method, 'params': params})
+        return future
+
+    def _write(self, message: Dict):
+        data = (json.dumps(message) + '\n').encode()
+        with self.write_lock:
+            if not self.connected():
+                raise ConnectionError('MCP server is not running')
+            self.process.stdin.write(data)
+            self.process.stdin.flush()
+
+    def _read_responses(self, process: subprocess.Popen):
+        """Resolve pending requests as responses arrive; answer server pings"""
+        for line in process.stdout:
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue  # Servers may log to stdout before the handshake
+            if not isinstance(message, dict):
+                continue
+
+            if 'method' in message:
+                if message.get('method') == 'ping' and 'id' in message:
+                    try:
+                        self._write({'jsonrpc': '2.0', 'id': message['id'], 'result': {}})
+                    except Exception:
+                        pass
+                continue
+
+            with self.lock:
+                future = self.pending.pop(message.get('id'), None)
+            if future is None:
+                continue
+            if 'error' in message:
+                future.set_exception(MCPError(message['error'].get('message', 'MCP error')))
+            else:
+                future.set_result(message.get('result', {}))
+
+        # Server exited: wake everyone still waiting on this process
+        if process is self.process or self.process is None:
+            with self.lock:
+                pending, self.pending = self.pending, {}
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError('MCP server exited'))
+
+
+def tool_text(result: Any) -> str:
+    """Text content of a tools/call result"""
+    if not isinstance(result, dict):
+        return ''
+    return ''.join(item.get('text', '') for item in result.get('content', [])
+                   if isinstance(item, dict) and item.get('type') == 'text')
+
+
+def tool_data(result: Any) -> Any:
+    """JSON carried in a tools/call result's text content (the text itself if not JSON)"""
+    text = tool_text(result)
+    try:
+        return json.loads(text) if text else None
+    except ValueError:
+        return text
+
+
+_client: Optional[MCPClient] = None
+
+
+def get_client() -> MCPClient:
+    """Process-wide client, connected on first use"""
+    global _client
+    if _client is None:
+        _client = MCPClient()
+    return _client
+
 
 def save_to_serena(namespace, key, data):
     """Use Serena MCP to save memory"""
-    # This would call Serena's save_memory MCP command
-    # via Claude Code's MCP interface
-    cmd = [
-        "npx", "@modelcontextprotocol/cli",
-        "call", "serena", "save_memory",
-        json.dumps({
-            "namespace": namespace,
-            "key": key,
-            "data": data
-        })
-    ]
-    subprocess.run(cmd, capture_output=True)
-
-# Rest of consolidation logic...
\ No newline at end of file
+    try:
+        get_client().save_many([(namespace, key, data)])
+        return True
+    except Exception:
+        return False
+
+
+def save_many_to_serena(items: List[Tuple[str, str, Any]]) -> bool:
+    """Save (namespace, key, data) items over the shared connection in one round"""
+    try:
+        get_client().save_many(items)
+        return True
+    except Exception:
+        return False
+
+
+def run_fake_server(store_dir: Path):
+    """Minimal stdio MCP server for local testing: save_memory/load_memory on JSON files"""
+    store_dir = Path(store_dir)
+
+    def reply(request_id, result=None, error=None):
+        message = {'jsonrpc': '2.0', 'id': request_id}
+        message.update({'error': error} if error else {'result': result})
+        sys.stdout.write(json.dumps(message) + '\n')
+        sys.stdout.flush()
+
+    for line in sys.stdin:
+        try:
+            request = json.loads(line)
+        except ValueError:
+            continue
+        method, params = request.get('method'), request.get('params', {})
+        if 'id' not in request:
+            continue  # Notifications need no answer
+
+        if method == 'initialize':
+            reply(request['id'], {'protocolVersion': PROTOCOL_VERSION, 'capabilities': {'tools': {}},
+                                  'serverInfo': {'name': 'fake-serena', 'version': '0'}})
+        elif method == 'tools/call':
+            arguments = params.get('arguments', {})
+            path = store_dir / str(arguments.get('namespace', 'default')) / f"{arguments.get('key')}.json"
+            if params.get('name') == 'save_memory':
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text(json.dumps(arguments.get('data')))
+                reply(request['id'], {'content': [{'type': 'text', 'text': 'saved'}]})
+            elif params.get('name') == 'load_memory':
+                text = path.read_text() if path.exists() else 'null'
+                reply(request['id'], {'content': [{'type': 'text', 'text': text}]})
+            else:
+                reply(request['id'], {'content': [{'type': 'text', 'text': f"Unknown tool {params.get('name')}"}],
+                                      'isError': True})
+        else:
+            reply(request['id'], error={'code': -32601, 'message': f"Unknown method {method}"})
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else ''
+
+    if command == 'fake-server':
+        run_fake_server(Path(sys.argv[2] if len(sys.argv) > 2 else '/tmp/claude_session/fake_serena'))
+    elif command == 'save':
+        # Each stdin line: {"namespace": ..., "key": ..., "data": ...}
+        items = []
+        for line in sys.stdin:
+            try:
+                record = json.loads(line)
+                items.append((record['namespace'], record['key'], record.get('data')))
+            except (ValueError, KeyError):
+                continue
+        if items and save_many_to_serena(items):
+            print(f"✓ Saved {len(items)} memories to Serena")
+        elif items:
+            print("⚠️ Serena MCP unavailable")
+            sys.exit(1)
+    else:
+        print("Usage: consolidate_to_serena.py [save < records.jsonl | fake-server [store_dir]]")
+
+
+if __name__ == "__main__":
+    main()
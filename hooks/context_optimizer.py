@@ -6,9 +6,12 @@ Preserves important context while pruning redundant information
 
 import json
 import os
+import time
 from datetime import datetime
 from pathlib import Path
 
+from metrics_rollup import open_rollups
+
 class ContextOptimizer:
     def __init__(self):
         self.memory_path = Path('.serena/memories/context')
@@ -104,12 +107,18 @@ class ContextOptimizer:
                     suggestions.append(f"Old test results ({len(old_tests)-5} files)")
             
             # Check for duplicate patterns
+            patterns_log = Path('.serena/memories/patterns/discovered.jsonl')
             patterns_file = Path('.serena/memories/patterns/discovered.json')
-            if patterns_file.exists():
+            pattern_count = 0
+            if patterns_log.exists():
+                with open(patterns_log, 'r') as f:
+                    pattern_count = sum(1 for _ in f)
+            elif patterns_file.exists():
                 with open(patterns_file, 'r') as f:
-                    patterns = json.load(f)
-                    if len(patterns) > 50:
-                        suggestions.append(f"Excess patterns ({len(patterns)-50} items)")
+                    pattern_count = len(json.load(f))
+            
+            if pattern_count > 50:
+                suggestions.append(f"Excess patterns ({pattern_count-50} items)")
             
             # Log suggestions
             if suggestions:
@@ -136,6 +145,11 @@ class ContextOptimizer:
             with open(metrics_file, 'a') as f:
                 f.write(json.dumps(metric) + '\n')
             
+            rollups = open_rollups(self.memory_path.parent)
+            if rollups:
+                rollups.record_context(time.time(), metric['usage_percent'])
+                rollups.close()
+            
         except:
             pass
     
@@ -47,6 +47,8 @@ class HookHealthMonitor:
         """Check all hook files exist and are executable"""
         expected_hooks = [
             'memory_manager.py',
+            'memory_server.py',
+            'memory_client.py',
             'context_optimizer.py',
             'doc_cache.py',
             'auto_format.py',
@@ -0,0 +1,94 @@
+"""
+Keyword Scanner - Classify output lines into finding categories in one pass
+All keywords are compiled into a single case-insensitive alternation regex
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+DEFAULT_KEYWORDS = {
+    'patterns': ['pattern', 'found', 'detected', 'identified'],
+    'issues': ['error', 'issue', 'problem', 'warning'],
+    'solutions': ['fixed', 'resolved', 'solution', 'implemented']
+}
+
+# Per-project override: {"patterns": [...], "issues": [...], "solutions": [...]}
+KEYWORDS_FILE = os.environ.get('SYNTHESIS_KEYWORDS_FILE', '.claude/synthesis_keywords.json')
+
+
+def load_keywords(path: Optional[str] = None) -> Dict[str, List[str]]:
+    """Default keywords, with any categories the project file redefines"""
+    keywords = {category: list(words) for category, words in DEFAULT_KEYWORDS.items()}
+    try:
+        with open(Path(path or KEYWORDS_FILE), 'r') as f:
+            overrides = json.load(f)
+        for category, words in overrides.items():
+            if category in keywords and isinstance(words, list):
+                keywords[category] = [str(word) for word in words if word]
+    except (OSError, ValueError):
+        pass
+    return keywords
+
+
+class KeywordScanner:
+    """Finds keyword lines with one regex search per hit instead of one scan per keyword"""
+
+    def __init__(self, keywords: Optional[Dict[str, List[str]]] = None):
+        self.keywords = keywords or load_keywords()
+        self.categories = list(self.keywords)
+
+        # Keyword -> every category whose keyword occurs inside it, so a longer
+        # match never hides a shorter keyword from another category
+        words = {word.lower() for group in self.keywords.values() for word in group}
+        self.word_categories = {
+            word: frozenset(category for category, group in self.keywords.items()
+                            if any(other.lower() in word for other in group))
+            for word in words
+        }
+        self.word_categories.update({word.encode(): categories
+                                     for word, categories in self.word_categories.items()})
+
+        # Case-sensitive search over lowercased text is several times faster than IGNORECASE
+        alternation = '|'.join(re.escape(word) for word in sorted(words, key=len, reverse=True)) or '(?!)'
+        self.regex = re.compile(alternation)
+        self.bytes_regex = re.compile(alternation.encode())
+
+    def scan(self, text) -> Iterator[Tuple[str, Set[str]]]:
+        """Yield (line, categories) for every line containing a keyword
+
+        Accepts str or bytes (decoded as UTF-8); matching ignores ASCII case.
+        Lines without keywords are never visited.
+        """
+        if isinstance(text, str) and text.isascii():
+            original, folded, regex, newline = text, text.lower(), self.regex, '\n'
+        else:
+            # bytes.lower() keeps offsets stable, unlike str.lower() on non-ASCII text
+            original = text.encode() if isinstance(text, str) else bytes(text)
+            folded, regex, newline = original.lower(), self.bytes_regex, b'\n'
+
+        categories = self.word_categories
+        size = len(folded)
+        position = 0
+
+        while True:
+            match = regex.search(folded, position)
+            if match is None:
+                return
+
+            start = folded.rfind(newline, 0, match.start()) + 1
+            end = folded.find(newline, match.end())
+            end = size if end == -1 else end
+
+            found = set(categories.get(match.group(), ()))
+            while len(found) < len(self.categories):
+                match = regex.search(folded, match.end(), end)
+                if match is None:
+                    break
+                found.update(categories.get(match.group(), ()))
+
+            line = original[start:end]
+            yield (line if newline == '\n' else line.decode(errors='replace')), found
+            position = end + 1
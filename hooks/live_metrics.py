@@ -0,0 +1,186 @@
+"""
+Live Metrics - Tail the metric logs and keep rolling-window statistics
+Each tick reads only the bytes appended since the previous one
+"""
+
+import json
+import math
+import sys
+import time
+from collections import deque, defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+
+class LogTailer:
+    """Follows one JSONL file by byte offset, surviving rotation and truncation"""
+
+    def __init__(self, path: Path, backfill_bytes: Optional[int] = None):
+        self.path = Path(path)
+        self.backfill_bytes = backfill_bytes
+        self.inode = None
+        self.offset = 0
+        self.skipped = 0  # Complete lines that were not a JSON object
+
+    def read(self) -> Iterator[Dict]:
+        """Yield records appended since the last call"""
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return
+
+        if stat.st_ino != self.inode or stat.st_size < self.offset:
+            # A backfill limit makes the first open start near the end;
+            # a rotated or truncated file is always read from the top
+            first_open = self.inode is None
+            self.inode = stat.st_ino
+            if first_open and self.backfill_bytes is not None:
+                self.offset = max(0, stat.st_size - self.backfill_bytes)
+            else:
+                self.offset = 0
+        if stat.st_size == self.offset:
+            return
+
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            if self.offset and self._mid_line(f):
+                f.readline()  # Skip the partial first line of a backfill
+                self.offset = f.tell()
+
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # Still being written - pick it up next tick
+                self.offset += len(line)
+
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    self.skipped += 1
+                    continue
+                if isinstance(record, dict):
+                    yield record
+                else:
+                    self.skipped += 1
+
+    def _mid_line(self, f) -> bool:
+        """True if the current offset is not at the start of a line"""
+        f.seek(self.offset - 1)
+        at_start = f.read(1) == b'\n'
+        f.seek(self.offset)
+        return not at_start
+
+
+class LiveWatcher:
+    """Rolling-window throughput, latency percentiles and error rate"""
+
+    def __init__(self, sources: Dict[str, Path], interval: float = 2.0, window: float = 300,
+                 backfill_bytes: int = 1024 * 1024):
+        self.interval = interval
+        self.window = window
+        self.tailers = {source: LogTailer(path, backfill_bytes) for source, path in sources.items()}
+        self.tasks = deque()       # (time, duration_ms, success)
+        self.context = deque()     # (time, usage_percent)
+        self.navigation = deque()  # (time, operation)
+        self.totals = defaultdict(int)
+
+    def poll(self):
+        """Read newly appended records and drop those outside the window"""
+        now = time.time()
+
+        for record in self.tailers['tasks'].read():
+            self.totals['tasks'] += 1
+            self.tasks.append((_record_time(record, now), record.get('duration_ms', 0),
+                               bool(record.get('success', False))))
+        for record in self.tailers['context'].read():
+            self.totals['context'] += 1
+            self.context.append((_record_time(record, now), record.get('usage_percent', 0)))
+        for record in self.tailers['navigation'].read():
+            self.totals['navigation'] += 1
+            self.navigation.append((_record_time(record, now), record.get('operation', 'unknown')))
+
+        cutoff = now - self.window
+        for events in (self.tasks, self.context, self.navigation):
+            while events and events[0][0] < cutoff:
+                events.popleft()
+
+    def snapshot(self) -> Dict:
+        """Current rolling-window figures"""
+        durations = sorted(duration for _, duration, _ in self.tasks if duration > 0)
+        failures = sum(1 for _, _, success in self.tasks if not success)
+        operations = defaultdict(int)
+        for _, operation in self.navigation:
+            operations[operation] += 1
+
+        return {
+            'window_s': self.window,
+            'tasks': len(self.tasks),
+            'throughput_per_min': round(len(self.tasks) / (self.window / 60), 2),
+            'error_rate': round(failures / len(self.tasks) * 100, 1) if self.tasks else 0,
+            'p50_ms': _percentile(durations, 0.5),
+            'p95_ms': _percentile(durations, 0.95),
+            'p99_ms': _percentile(durations, 0.99),
+            'context_usage': self.context[-1][1] if self.context else 0,
+            'context_peak': max((usage for _, usage in self.context), default=0),
+            'navigations': len(self.navigation),
+            'operations': dict(operations),
+            'totals': dict(self.totals)
+        }
+
+    def render(self, snapshot: Dict) -> str:
+        """One screen of the live view"""
+        lines = [
+            f"📡 Live Performance - last {_format_window(self.window)} "
+            f"(updated {datetime.now().strftime('%H:%M:%S')}, every {self.interval:g}s)",
+            "=" * 50,
+            f"⏱️  Tasks: {snapshot['tasks']} ({snapshot['throughput_per_min']}/min)",
+            f"   • Latency p50/p95/p99: {snapshot['p50_ms']}/{snapshot['p95_ms']}/{snapshot['p99_ms']}ms",
+            f"   • Error Rate: {snapshot['error_rate']}%",
+            f"🧠 Context: {snapshot['context_usage']}% now, {snapshot['context_peak']}% peak",
+            f"🔍 Navigations: {snapshot['navigations']}"
+        ]
+        for operation, count in sorted(snapshot['operations'].items(), key=lambda item: -item[1])[:5]:
+            lines.append(f"   • {operation}: {count}")
+
+        totals = snapshot['totals']
+        lines.append(f"\nSeen since start: {totals.get('tasks', 0)} tasks, "
+                     f"{totals.get('context', 0)} context samples, {totals.get('navigation', 0)} navigations")
+        lines.append("Press Ctrl-C to stop")
+        return '\n'.join(lines)
+
+    def run(self):
+        """Redraw in place until interrupted"""
+        redraw = sys.stdout.isatty()
+        try:
+            while True:
+                self.poll()
+                frame = self.render(self.snapshot())
+                if redraw:
+                    sys.stdout.write('\x1b[H\x1b[J' + frame + '\n')
+                else:
+                    sys.stdout.write(frame + '\n\n')
+                sys.stdout.flush()
+                time.sleep(self.interval)
+        except KeyboardInterrupt:
+            pass
+
+
+def _record_time(record: Dict, default: float) -> float:
+    try:
+        return datetime.fromisoformat(str(record['timestamp']).replace('Z', '')).timestamp()
+    except Exception:
+        return default
+
+
+def _percentile(values, q: float) -> int:
+    """Nearest-rank percentile of sorted values"""
+    if not values:
+        return 0
+    return int(values[min(len(values) - 1, max(0, math.ceil(q * len(values)) - 1))])
+
+
+def _format_window(seconds: float) -> str:
+    for unit, size in (('d', 86400), ('h', 3600), ('m', 60)):
+        if seconds >= size and seconds % size == 0:
+            return f"{int(seconds // size)}{unit}"
+    return f"{int(seconds)}s"
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Memory Client - Thin hook entry point for the memory server
+Forwards commands over a Unix socket, falling back to an in-process MemoryManager
+"""
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+SOCKET_PATH = os.environ.get('MEMORY_MANAGER_SOCKET', '.serena/memories/memory_manager.sock')
+REQUEST_TIMEOUT = 10
+FORWARDED_ENV = ('TASK_ID', 'AGENT_ID', 'PARENT_ID', 'CLAUDE_SESSION_ID')
+TIMINGS_FILE = Path('.serena/memories/context/hook_timings.jsonl')
+
+
+def is_request_env(key: str) -> bool:
+    """True for the per-call hook variables the manager reads"""
+    return key.startswith('TOOL_') or key in FORWARDED_ENV
+
+
+def _tool_env() -> dict:
+    """Collect the hook variables the manager reads"""
+    return {key: value for key, value in os.environ.items() if is_request_env(key)}
+
+
+def _call_server(command: str) -> bool:
+    """Run command on the server; False means it was never delivered"""
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.settimeout(REQUEST_TIMEOUT)
+
+    try:
+        client.connect(SOCKET_PATH)
+    except OSError:
+        client.close()
+        return False
+
+    try:
+        client.sendall((json.dumps({'command': command, 'env': _tool_env()}) + '\n').encode())
+        response = json.loads(client.makefile('rb').readline() or b'{}')
+        sys.stdout.write(response.get('output', ''))
+    except Exception:
+        pass  # Request was delivered - never run it twice
+    finally:
+        client.close()
+
+    return True
+
+
+def _spawn_server():
+    """Start a detached server so the next hook call is fast"""
+    if os.environ.get('MEMORY_MANAGER_DAEMON', '1') == '0':
+        return
+
+    # The server outlives this call; it must not inherit this call's tool input
+    env = {key: value for key, value in os.environ.items() if not is_request_env(key)}
+    try:
+        subprocess.Popen(
+            [sys.executable, str(Path(__file__).with_name('memory_server.py')), 'start'],
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True
+        )
+    except Exception:
+        pass
+
+
+def _record_timing(command: str, mode: str, started: float):
+    """Append this hook's execution time for the metrics endpoint"""
+    try:
+        TIMINGS_FILE.parent.mkdir(parents=True, exist_ok=True)
+        line = json.dumps({
+            'timestamp': datetime.now().isoformat(),
+            'hook': 'memory_client',
+            'command': command,
+            'mode': mode,
+            'duration_ms': round((time.perf_counter() - started) * 1000, 2)
+        }) + '\n'
+        fd = os.open(TIMINGS_FILE, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(fd, line.encode())
+        finally:
+            os.close(fd)
+    except Exception:
+        pass
+
+
+def main():
+    """Main entry point"""
+    if len(sys.argv) < 2:
+        print("Usage: memory_client.py [init|pre_task|post_task|span_start|span_end|serena_sync|compact|migrate|stats]")
+        sys.exit(0)
+
+    started = time.perf_counter()
+    if _call_server(sys.argv[1]):
+        _record_timing(sys.argv[1], 'server', started)
+        return
+
+    # Server not running - do the work in-process and warm one up for next time
+    _spawn_server()
+
+    import memory_manager
+    memory_manager.main()
+    _record_timing(sys.argv[1], 'inline', started)
+
+
+if __name__ == "__main__":
+    main()
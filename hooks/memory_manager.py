@@ -7,38 +7,668 @@ Optimized for speed and non-blocking operations
 import json
 import os
 import sys
+import atexit
+import bisect
+import contextlib
+import fcntl
 import hashlib
 import time
 from datetime import datetime
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
+
+from memory_store import SQLiteMemoryStore
+from metrics_rollup import open_rollups
+
+def measure_parallelism(spans: List[Tuple[float, float]]) -> Dict:
+    """Speedup and critical path from per-agent (start, end) spans in seconds"""
+    spans = sorted((start, end) for start, end in spans if end >= start)
+    if not spans:
+        return {'agent_count': 0, 'busy_ms': 0, 'wall_ms': 0, 'critical_path_ms': 0,
+                'longest_ms': 0, 'speedup': 1.0, 'efficiency': 100}
+    busy = sum(end - start for start, end in spans)
+    wall = max(end for _, end in spans) - min(start for start, _ in spans)
+
+    # Critical path: the longest chain of spans that ran back to back
+    # (weighted interval scheduling over spans ordered by end time)
+    by_end = sorted(spans, key=lambda span: span[1])
+    ends = [end for _, end in by_end]
+    chain = [0.0]
+    for i, (start, end) in enumerate(by_end):
+        previous = bisect.bisect_right(ends, start, 0, i)
+        chain.append(max(chain[-1], chain[previous] + (end - start)))
+    critical_path = chain[-1]
+
+    speedup = busy / wall if wall > 0 else 1.0
+    return {
+        'agent_count': len(spans),
+        'busy_ms': int(busy * 1000),
+        'wall_ms': int(wall * 1000),
+        'critical_path_ms': int(critical_path * 1000),
+        'longest_ms': int(max(end - start for start, end in spans) * 1000),
+        'speedup': round(speedup, 2),
+        'efficiency': min(100, int(speedup / len(spans) * 100))
+    }
+
+
+class CacheLog:
+    """Log-structured cache: a snapshot plus an append-only log of deltas"""
+
+    def __init__(self, base_path: Path, max_log_bytes: int = 512 * 1024):
+        self.snapshot_file = base_path / 'cache.snapshot.json'
+        self.log_file = base_path / 'cache.log'
+        self.legacy_file = base_path / 'cache.json'
+        self.max_log_bytes = max_log_bytes
+        self.position = None  # (log inode, snapshot identity, offset) reached by the last load or refresh
+        self.own: Dict[int, int] = {}  # Start -> end offset of records this process appended
+
+    def load(self) -> Dict:
+        """Rebuild state from the latest snapshot plus the log tail"""
+        if not self.log_file.exists():
+            self.position = (None, self._snapshot_id(), 0)
+            return self._read_snapshot()
+
+        with open(self.log_file, 'rb') as log:
+            fcntl.flock(log, fcntl.LOCK_SH)
+            try:
+                return self._load(log)
+            finally:
+                fcntl.flock(log, fcntl.LOCK_UN)
+
+    def refresh(self, state: Dict) -> Tuple[Dict, Optional[List[Dict]]]:
+        """Apply the deltas other processes appended since the last load or refresh
+
+        Returns the state and the deltas applied to it. If the log was compacted
+        or replaced meanwhile, state is reloaded in full and the deltas are None.
+        """
+        log_inode, snapshot_id, offset = self.position or (None, None, 0)
+        if not self.log_file.exists():
+            if self.position and log_inode is None and snapshot_id == self._snapshot_id():
+                return state, []
+            return self.load(), None
+
+        with open(self.log_file, 'rb') as log:
+            fcntl.flock(log, fcntl.LOCK_SH)
+            try:
+                stat = os.fstat(log.fileno())
+                if (self.position is None or stat.st_ino != log_inode or stat.st_size < offset
+                        or self._snapshot_id() != snapshot_id):
+                    return self._load(log), None
+
+                applied = []
+                state = self._replay(state, log, offset, applied)
+                self.position = (log_inode, snapshot_id, log.tell())
+                return state, applied
+            finally:
+                fcntl.flock(log, fcntl.LOCK_UN)
+
+    def _load(self, log) -> Dict:
+        state = self._replay(self._read_snapshot(), log)
+        self.position = (os.fstat(log.fileno()).st_ino, self._snapshot_id(), log.tell())
+        self.own.clear()  # Everything up to here is in state, including our own records
+        return state
+
+    def _snapshot_id(self) -> Optional[Tuple[int, int, int]]:
+        """Changes whenever a compaction writes a new snapshot"""
+        try:
+            stat = self.snapshot_file.stat()
+            return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def set(self, path: List[str], value: Any):
+        """Append a delta record; cost is the size of the change"""
+        self._append({'p': path, 'v': value})
+
+    def delete(self, path: List[str]):
+        """Append a tombstone for one entry"""
+        self._append({'p': path, 'd': 1})
+
+    def write(self, deltas: List[Dict]):
+        """Append several delta records with one write ({'p', 'i'} adds to counters)"""
+        if deltas:
+            self._append(*deltas)
+
+    def _append(self, *deltas: Dict):
+        record = ''.join(json.dumps(delta) + '\n' for delta in deltas).encode()
+        self.log_file.parent.mkdir(parents=True, exist_ok=True)
+
+        fd = os.open(self.log_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_SH)
+            os.write(fd, record)
+            end = os.lseek(fd, 0, os.SEEK_CUR)  # O_APPEND leaves us right after our own record
+            self.own[end - len(record)] = end  # Already in memory: refresh() must not apply it again
+            log_size = os.fstat(fd).st_size
+        finally:
+            os.close(fd)
+
+        if log_size > self.max_log_bytes:
+            self.compact()
+
+    def compact(self):
+        """Fold the log into a new snapshot and truncate it"""
+        with open(self.log_file, 'r+b') as log:
+            fcntl.flock(log, fcntl.LOCK_EX)
+            try:
+                # Rebuild from disk so deltas from other hook processes survive
+                state = self._replay(self._read_snapshot(), log)
+
+                tmp_file = self.snapshot_file.with_suffix('.tmp')
+                with open(tmp_file, 'w') as f:
+                    json.dump(state, f)
+                os.replace(tmp_file, self.snapshot_file)
+
+                log.truncate(0)
+                self.own.clear()
+            finally:
+                fcntl.flock(log, fcntl.LOCK_UN)
+
+    def _read_snapshot(self) -> Dict:
+        """Load the snapshot, migrating a legacy cache.json if needed
+
+        An unreadable snapshot falls back to the legacy file, and then to an
+        empty state, so the log alone still rebuilds what it can.
+        """
+        for source in (self.snapshot_file, self.legacy_file):
+            if source.exists():
+                try:
+                    with open(source, 'r') as f:
+                        state = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                if isinstance(state, dict):
+                    return state
+        return {}
+
+    def _replay(self, state: Dict, log, offset: int = 0, applied: Optional[List[Dict]] = None) -> Dict:
+        """Apply every complete delta record from offset on to state
+
+        With applied, records this process appended itself are skipped (they are
+        already in its state) and the others are collected into the list.
+        """
+        log.seek(offset)
+        own_end = 0
+        for line in log:
+            if not line.endswith(b'\n'):
+                log.seek(offset)
+                break  # Still being written - picked up by the next refresh
+            start, offset = offset, offset + len(line)
+            if applied is not None:
+                own_end = max(own_end, self.own.pop(start, 0))
+                if start < own_end:
+                    continue
+
+            try:
+                record = json.loads(line)
+                self._apply(state, record)
+            except (ValueError, TypeError, KeyError, AttributeError):
+                continue  # Torn write from a crashed hook, or a record of the wrong shape
+            if applied is not None:
+                applied.append(record)
+
+        return state
+
+    @staticmethod
+    def _apply(state: Dict, record: Dict):
+        """Apply one delta record; raises before changing anything if it has the wrong shape"""
+        path = record['p']
+        if not isinstance(path, list) or not path or not all(isinstance(key, str) for key in path):
+            raise ValueError(f"Bad delta path: {path!r}")
+        increments = record.get('i')
+        if 'i' in record and not (isinstance(increments, dict) and all(
+                isinstance(amount, (int, float)) and not isinstance(amount, bool)
+                for amount in increments.values())):
+            raise ValueError(f"Bad increments: {increments!r}")
+
+        # Check the whole path first so a bad record leaves no half-made branches
+        *parents, leaf = path
+        node = state
+        for key in parents + ([leaf] if increments is not None else []):
+            node = node.get(key, {})
+            if not isinstance(node, dict):
+                raise TypeError(f"Not a mapping at {path!r}")
+        if increments is not None and not all(
+                isinstance(node.get(key, 0), (int, float)) for key in increments):
+            raise TypeError(f"Not a counter at {path!r}")
+        if not record.get('d') and increments is None:
+            value = record['v']
+
+        node = state
+        for key in parents:
+            node = node.setdefault(key, {})
+        if record.get('d'):
+            node.pop(leaf, None)
+        elif increments is not None:
+            counters = node.setdefault(leaf, {})
+            for key, amount in increments.items():
+                counters[key] = counters.get(key, 0) + amount
+        else:
+            node[leaf] = value
+
+
+class JournalWriter:
+    """Write-behind JSONL journal: batches records and appends each batch with one O_APPEND write"""
+
+    def __init__(self, max_bytes: int = 64 * 1024, max_delay: float = 2.0):
+        self.max_bytes = max_bytes
+        self.max_delay = max_delay
+        self.buffers: Dict[Path, List[bytes]] = {}
+        self.buffered_bytes: Dict[Path, int] = {}
+        self.first_buffered: Dict[Path, float] = {}
+        atexit.register(self.flush)
+
+    def append(self, path: Path, record: Dict):
+        """Buffer one record, flushing its file on the size or age threshold"""
+        line = (json.dumps(record) + '\n').encode()
+        self.buffers.setdefault(path, []).append(line)
+        self.buffered_bytes[path] = self.buffered_bytes.get(path, 0) + len(line)
+        self.first_buffered.setdefault(path, time.time())
+
+        if self.buffered_bytes[path] >= self.max_bytes:
+            self.flush(path)
+        else:
+            self.flush_due()
+
+    def flush_due(self):
+        """Flush every buffer older than max_delay"""
+        now = time.time()
+        for path, since in list(self.first_buffered.items()):
+            if now - since >= self.max_delay:
+                self.flush(path)
+
+    def flush(self, path: Optional[Path] = None):
+        """Write out one buffer, or all of them"""
+        for target in ([path] if path else list(self.buffers)):
+            lines = self.buffers.pop(target, None)
+            self.buffered_bytes.pop(target, None)
+            self.first_buffered.pop(target, None)
+            if not lines:
+                continue
+
+            try:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                data = b''.join(lines)
+                fd = os.open(target, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    # Whole batch in one append so concurrent hooks never interleave lines
+                    written = os.write(fd, data)
+                    while written < len(data):
+                        written += os.write(fd, data[written:])
+                finally:
+                    os.close(fd)
+            except OSError:
+                pass  # Non-blocking - dropping telemetry beats failing a hook
+
+
+def _valid_entry(entry) -> bool:
+    """Entries written before sizes and sources were tracked cannot be validated"""
+    return isinstance(entry, dict) and {'data', 'size', 'sources'} <= entry.keys()
+
+
+class ContextCache:
+    """Size-bounded LRU cache of task contexts with TTL and source-file invalidation
+
+    Hits and counters stay in memory and go to the cache log as one batch on
+    flush(); counters are logged as increments so concurrent hooks add up.
+    """
+
+    def __init__(self, state: Dict, persist, remove, write, max_bytes: int, max_entries: int, ttl: int):
+        self.persist = persist
+        self.remove = remove
+        self.write = write  # Appends a list of CacheLog deltas in one write
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.load(state)
+        self.pending: Dict[str, int] = {}  # Counter increments not logged yet
+        self.used: Dict[str, float] = {}   # last_used of entries hit since the last flush
+        atexit.register(self.flush)
+
+    def load(self, state: Dict):
+        """Take entries and counters from cache state"""
+        self.stats = dict({'hits': 0, 'misses': 0, 'evictions': 0, 'expired': 0, 'invalidated': 0},
+                          **state.get('context_stats', {}))
+        entries = [(key, entry) for key, entry in state.get('contexts', {}).items() if _valid_entry(entry)]
+        entries.sort(key=lambda item: item[1].get('last_used', item[1].get('timestamp', 0)))
+        self.entries = OrderedDict(entries)
+        self.total_bytes = sum(entry['size'] for entry in self.entries.values())
+
+    def merge(self, state: Dict, deltas: List[Dict]):
+        """Fold in entries and counter increments other processes logged"""
+        for delta in deltas:
+            path = delta.get('p')
+            if path == ['context_stats'] and isinstance(delta.get('i'), dict):
+                for counter, amount in delta['i'].items():
+                    self.stats[counter] = self.stats.get(counter, 0) + amount
+            elif isinstance(path, list) and len(path) > 1 and path[0] == 'contexts':
+                key = path[1]
+                if key in self.entries:
+                    self.total_bytes -= self.entries.pop(key)['size']
+                entry = state.get('contexts', {}).get(key)
+                if _valid_entry(entry):
+                    self.entries[key] = entry
+                    self.total_bytes += entry['size']
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return cached data if it is within TTL and its sources are unchanged"""
+        entry = self.entries.get(key)
+        result = None
+
+        if entry is None:
+            self._count('misses')
+        elif time.time() - entry.get('timestamp', 0) >= self.ttl:
+            self._drop(key, 'expired')
+        elif any(self._fingerprint(Path(source)) != fingerprint
+                 for source, fingerprint in entry['sources'].items()):
+            self._drop(key, 'invalidated')
+        else:
+            self._count('hits')
+            self.entries.move_to_end(key)
+            entry['last_used'] = self.used[key] = time.time()
+            result = entry['data']
+
+        return result
+
+    def put(self, key: str, data: Dict, sources: List[Path]):
+        """Cache data, evicting least recently used entries to fit the budgets"""
+        size = len(json.dumps(data))
+        if size > self.max_bytes:
+            # Would evict everything else - not worth caching; a stale copy must not survive
+            if key in self.entries:
+                self.total_bytes -= self.entries.pop(key)['size']
+                self.remove(['contexts', key])
+            return
+        if key in self.entries:
+            self.total_bytes -= self.entries.pop(key)['size']
+
+        now = time.time()
+        entry = {
+            'timestamp': now,
+            'last_used': now,
+            'size': size,
+            'sources': {str(source): self._fingerprint(source) for source in sources},
+            'data': data
+        }
+        self.entries[key] = entry
+        self.total_bytes += size
+
+        while self.total_bytes > self.max_bytes or len(self.entries) > self.max_entries:
+            oldest = next(iter(self.entries))
+            self.total_bytes -= self.entries.pop(oldest)['size']
+            self._count('evictions')
+            self.remove(['contexts', oldest])
+
+        self.used.pop(key, None)
+        self.persist(['contexts', key], entry)
+        self.flush()
+
+    def flush(self):
+        """Log pending counter increments and last_used times as one batch"""
+        deltas = [{'p': ['contexts', key, 'last_used'], 'v': used}
+                  for key, used in self.used.items() if key in self.entries]
+        if self.pending:
+            deltas.append({'p': ['context_stats'], 'i': self.pending})
+        self.pending, self.used = {}, {}
+        if deltas:
+            self.write(deltas)
+
+    def summary(self) -> Dict:
+        """Counters plus current occupancy, for tuning"""
+        lookups = self.stats['hits'] + self.stats['misses'] + self.stats['expired'] + self.stats['invalidated']
+        return dict(self.stats,
+                    hit_rate=round(self.stats['hits'] / lookups * 100, 1) if lookups else 0.0,
+                    entries=len(self.entries),
+                    bytes=self.total_bytes,
+                    max_bytes=self.max_bytes,
+                    max_entries=self.max_entries,
+                    ttl=self.ttl)
+
+    def _count(self, counter: str):
+        self.stats[counter] += 1
+        self.pending[counter] = self.pending.get(counter, 0) + 1
+
+    def _drop(self, key: str, reason: str):
+        self._count(reason)
+        self.used.pop(key, None)
+        self.total_bytes -= self.entries.pop(key)['size']
+        self.remove(['contexts', key])
+
+    def _fingerprint(self, source: Path) -> Optional[List[int]]:
+        """mtime and size of a source file, None if it does not exist"""
+        try:
+            stat = source.stat()
+            return [stat.st_mtime_ns, stat.st_size]
+        except OSError:
+            return None
+
+
+class PatternIndex:
+    """Append-only discovered-pattern log with a persistent hash index"""
+
+    def __init__(self, patterns_dir: Path, retention: int):
+        self.data_file = patterns_dir / 'discovered.jsonl'
+        self.index_file = patterns_dir / 'discovered.idx'
+        self.legacy_file = patterns_dir / 'discovered.json'
+        self.retention = retention
+        self.hashes = set()
+        self.count = 0
+        self._offset = 0
+        self._inode = None
+
+    def add(self, patterns: List[Dict], hash_fn) -> List[Dict]:
+        """Append patterns not seen before; O(1) membership check per pattern"""
+        self.index_file.parent.mkdir(parents=True, exist_ok=True)
+
+        with self._locked_index() as index:
+            self._migrate_legacy(index, hash_fn)
+            self._refresh(index)
+
+            added, hashes = [], []
+            for pattern in patterns:
+                pattern_hash = hash_fn(pattern)
+                if pattern_hash not in self.hashes:
+                    self.hashes.add(pattern_hash)
+                    added.append(pattern)
+                    hashes.append(pattern_hash)
+
+            if added:
+                self._append(self.data_file, ''.join(json.dumps(p) + '\n' for p in added))
+                self._offset += self._append(self.index_file, ''.join(h + '\n' for h in hashes))
+                self.count += len(added)
+
+            return added
+
+    def refresh(self):
+        """Catch up with patterns appended by other processes"""
+        if self.index_file.exists():
+            with self._locked_index() as index:
+                self._refresh(index)
+
+    def needs_compaction(self, slack: int = 0) -> bool:
+        return self.count > self.retention + slack
+
+    def compact(self, hash_fn):
+        """Keep the newest `retention` patterns and rebuild the index from them"""
+        if not self.data_file.exists():
+            return
+
+        with self._locked_index():
+            kept = []
+            with open(self.data_file, 'r') as f:
+                for line in f:
+                    try:
+                        kept.append(json.loads(line))
+                    except:
+                        continue  # Torn write from a crashed hook
+            kept = kept[-self.retention:]
+
+            # The index is derived data, so recompute it from what we keep
+            hashes = [hash_fn(p) for p in kept]
+            self._replace(self.data_file, ''.join(json.dumps(p) + '\n' for p in kept))
+            self._replace(self.index_file, ''.join(h + '\n' for h in hashes))
+
+            self.hashes = set(hashes)
+            self.count = len(kept)
+            stat = self.index_file.stat()
+            self._inode, self._offset = stat.st_ino, stat.st_size
+
+    @contextlib.contextmanager
+    def _locked_index(self):
+        """Exclusive lock on the live index file, retrying if compaction replaced it"""
+        while True:
+            index = open(self.index_file, 'a+b')
+            fcntl.flock(index, fcntl.LOCK_EX)
+            try:
+                if os.stat(self.index_file).st_ino == os.fstat(index.fileno()).st_ino:
+                    break
+            except FileNotFoundError:
+                pass
+            index.close()
+
+        try:
+            yield index
+        finally:
+            index.close()
+
+    def _refresh(self, index):
+        """Pick up hashes appended by other hook processes since our last read"""
+        stat = os.fstat(index.fileno())
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            self.hashes, self.count, self._offset = set(), 0, 0
+            self._inode = stat.st_ino
+
+        index.seek(self._offset)
+        tail = index.read()
+        complete = tail[:tail.rfind(b'\n') + 1]
+        for line in complete.splitlines():
+            self.hashes.add(line.decode())
+            self.count += 1
+        self._offset += len(complete)
+
+    def _migrate_legacy(self, index, hash_fn):
+        """Convert a discovered.json written by older hooks, once"""
+        if self.data_file.exists() or not self.legacy_file.exists():
+            return
+
+        try:
+            with open(self.legacy_file, 'r') as f:
+                legacy = json.load(f)
+        except:
+            legacy = []
+
+        self._append(self.data_file, ''.join(json.dumps(p) + '\n' for p in legacy))
+        index.truncate(0)
+        self._append(self.index_file, ''.join(hash_fn(p) + '\n' for p in legacy))
+
+    def _append(self, path: Path, text: str) -> int:
+        """Single O_APPEND write; returns bytes written"""
+        data = text.encode()
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+        return len(data)
+
+    def _replace(self, path: Path, text: str):
+        tmp_file = path.with_suffix(path.suffix + '.tmp')
+        with open(tmp_file, 'w') as f:
+            f.write(text)
+        os.replace(tmp_file, path)
+
 
 class MemoryManager:
     def __init__(self):
         self.base_path = Path('.serena/memories')
         self.categories = ['architecture', 'patterns', 'decisions', 'context', 'tasks']
-        self.cache_file = self.base_path / 'cache.json'
+        self.cache_log = CacheLog(self.base_path)
         self.cache = self._load_cache()
+        self.store = self._open_store()
+        self.journal = JournalWriter(
+            max_bytes=int(os.environ.get('JOURNAL_MAX_BYTES', str(64 * 1024))),
+            max_delay=float(os.environ.get('JOURNAL_MAX_DELAY', '2.0'))
+        )
+        self.context_cache = ContextCache(
+            self.cache,
+            persist=self._update_cache,
+            remove=self._remove_cache,
+            write=self._write_cache,
+            max_bytes=int(os.environ.get('CONTEXT_CACHE_BYTES', str(1024 * 1024))),
+            max_entries=int(os.environ.get('CONTEXT_CACHE_ENTRIES', '64')),
+            ttl=int(os.environ.get('CONTEXT_CACHE_TTL', '600'))
+        )
+        self.pattern_index = PatternIndex(
+            self.base_path / 'patterns',
+            retention=int(os.environ.get('PATTERN_RETENTION', '500'))
+        )
+        self.rollups = None  # Opened by the first task that records into it
+        self.rollups_opened = False
         
     def _load_cache(self) -> Dict:
         """Load memory cache for fast access"""
-        if self.cache_file.exists():
-            try:
-                with open(self.cache_file, 'r') as f:
-                    return json.load(f)
-            except:
-                return {}
-        return {}
+        try:
+            return self.cache_log.load()
+        except:
+            return {}
+    
+    def refresh_cache(self):
+        """Catch up with cache deltas other hook processes logged since the last load"""
+        try:
+            self.context_cache.flush()  # Our pending counters go first, so a full reload has them
+            self.cache, deltas = self.cache_log.refresh(self.cache)
+        except Exception:
+            return
+        if deltas is None:
+            self.context_cache.load(self.cache)
+        else:
+            self.context_cache.merge(self.cache, deltas)
     
-    def _save_cache(self):
-        """Save cache asynchronously"""
+    def _open_store(self) -> Optional[SQLiteMemoryStore]:
+        """Open the SQLite backend when requested or already migrated"""
+        backend = os.environ.get('SERENA_MEMORY_BACKEND', '')
+        db_file = self.base_path / 'memories.db'
+        
+        if backend == 'files' or (backend != 'sqlite' and not db_file.exists()):
+            return None
+        
+        try:
+            return SQLiteMemoryStore(db_file)
+        except Exception:
+            return None
+    
+    def _update_cache(self, path: List[str], value: Any):
+        """Update one cache entry and append it to the cache log"""
+        node = self.cache
+        for key in path[:-1]:
+            node = node.setdefault(key, {})
+        node[path[-1]] = value
+
         try:
-            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.cache_file, 'w') as f:
-                json.dump(self.cache, f)
+            self.cache_log.set(path, value)
         except:
             pass  # Non-blocking - don't fail on cache errors
     
+    def _write_cache(self, deltas: List[Dict]):
+        """Append a batch of deltas to the cache log"""
+        try:
+            self.cache_log.write(deltas)
+        except:
+            pass
+    
+    def _remove_cache(self, path: List[str]):
+        """Delete one cache entry and append a tombstone to the cache log"""
+        node = self.cache
+        for key in path[:-1]:
+            node = node.get(key, {})
+        node.pop(path[-1], None)
+
+        try:
+            self.cache_log.delete(path)
+        except:
+            pass
+    
     def init(self):
         """Initialize memory structure (called on SessionStart)"""
         try:
@@ -64,15 +694,72 @@ class MemoryManager:
             # Non-blocking - just log
             print(f"Memory init notice: {e}")
     
+    def compact(self):
+        """Fold the cache log into a fresh snapshot"""
+        try:
+            if self.cache_log.log_file.exists():
+                self.cache_log.compact()
+            print("✓ Memory cache compacted")
+        except Exception as e:
+            print(f"Memory compact notice: {e}")
+    
+    def migrate(self):
+        """One-shot import of the JSON/JSONL tree into the SQLite store"""
+        try:
+            store = self.store or SQLiteMemoryStore(self.base_path / 'memories.db')
+            counts = store.migrate(self.base_path, self.categories)
+            self.store = store
+            if counts is None:
+                print(f"✓ {store.db_path} already migrated")
+                return
+            print(f"✓ Migrated {counts['documents']} documents and {counts['records']} records to {store.db_path}")
+        except Exception as e:
+            print(f"Memory migrate notice: {e}")
+    
+    def stats(self):
+        """Print context cache counters for tuning"""
+        summary = self.context_cache.summary()
+        print("🧠 Context cache:")
+        print(f"   • Hits: {summary['hits']} ({summary['hit_rate']}%)")
+        print(f"   • Misses: {summary['misses']}")
+        print(f"   • Expired: {summary['expired']} • Invalidated by source change: {summary['invalidated']}")
+        print(f"   • Evictions: {summary['evictions']}")
+        print(f"   • Entries: {summary['entries']}/{summary['max_entries']}")
+        print(f"   • Size: {summary['bytes']}/{summary['max_bytes']} bytes")
+    
+    def span_start(self):
+        """Mark an agent as started for the current task"""
+        try:
+            tool_input = json.loads(os.environ.get('TOOL_INPUT', '{}') or '{}')
+            self._start_span(tool_input)
+        except Exception:
+            pass
+    
+    def span_end(self):
+        """Mark an agent as finished for the current task"""
+        try:
+            tool_input = json.loads(os.environ.get('TOOL_INPUT', '{}') or '{}')
+            self._end_span(tool_input, collect=False)
+        except Exception:
+            pass
+    
     def pre_task(self):
         """Load relevant context before Task tool execution"""
         try:
             tool_input = json.loads(os.environ.get('TOOL_INPUT', '{}'))
             task_type = tool_input.get('type', 'unknown')
             
+            # Each Task call is one agent span of its batch
+            self._start_span(tool_input)
+            
             # Quick context lookup from cache
             relevant_context = self._get_relevant_context(task_type)
             
+            # Latest outcomes of this task type, an indexed query when SQLite is enabled
+            recent = self._recent_tasks(task_type)
+            if recent:
+                relevant_context = dict(relevant_context, recent_tasks=recent)
+            
             if relevant_context:
                 # Save to temp file for agent access
                 context_file = self.base_path / 'context' / 'current_context.json'
@@ -90,39 +777,59 @@ class MemoryManager:
         """Save task results and patterns to memory"""
         try:
             tool_response = json.loads(os.environ.get('TOOL_RESPONSE', '{}'))
+            tool_input = json.loads(os.environ.get('TOOL_INPUT', '{}') or '{}')
             
             # Extract patterns asynchronously
             if 'patterns' in tool_response:
                 self._save_patterns(tool_response['patterns'])
             
+            # Measured parallelism, once the last agent of the batch has finished
+            task_id, parallelism = self._end_span(tool_input, tool_response.get('spans', []))
+            
             # Track task metrics
             task_metrics = {
                 'timestamp': datetime.now().isoformat(),
+                'task_id': task_id,
+                'task_type': tool_input.get('type', 'unknown'),
                 'duration_ms': tool_response.get('duration_ms', 0),
                 'agent_count': tool_response.get('agent_count', 1),
                 'success': tool_response.get('status') == 'success'
             }
             
-            # Append to metrics log (non-blocking)
-            metrics_file = self.base_path / 'tasks' / 'metrics.jsonl'
-            metrics_file.parent.mkdir(parents=True, exist_ok=True)
+            if parallelism:
+                task_metrics.update(parallelism)
             
-            with open(metrics_file, 'a') as f:
-                f.write(json.dumps(task_metrics) + '\n')
+            # Append to metrics log (non-blocking)
+            self._append_log('tasks', 'metrics', task_metrics)
+            self._record_rollup(task_metrics)
             
             # Update cache
-            self.cache['last_task'] = task_metrics
-            self._save_cache()
+            self._update_cache(['last_task'], task_metrics)
             
-            # Calculate efficiency (non-blocking)
-            if task_metrics['agent_count'] > 1:
-                efficiency = self._calculate_efficiency(task_metrics)
-                if efficiency < 80:
-                    print(f"💡 Tip: Parallel efficiency {efficiency}% - consider fewer agents")
+            # Advise from what actually happened (non-blocking)
+            if parallelism and parallelism['efficiency'] < 80:
+                print(self._parallelism_tip(parallelism))
             
         except Exception:
             pass  # Never block on post-processing
     
+    def _record_rollup(self, task_metrics: Dict):
+        """Fold the task into the minute/hour/day rollups"""
+        if not self.rollups_opened:
+            self.rollups = open_rollups(self.base_path)
+            self.rollups_opened = True
+        if self.rollups is None:
+            return
+        try:
+            self.rollups.record_task(
+                time.time(),
+                task_metrics['duration_ms'],
+                task_metrics['success'],
+                task_metrics['agent_count']
+            )
+        except Exception:
+            pass  # Rollups are best-effort
+    
     def serena_sync(self):
         """Sync Serena operations with memory"""
         try:
@@ -131,17 +838,14 @@ class MemoryManager:
             
             if operation in ['find_symbol', 'get_symbol_dependencies']:
                 # Track code navigation patterns
-                nav_log = self.base_path / 'patterns' / 'navigation.jsonl'
-                nav_log.parent.mkdir(parents=True, exist_ok=True)
-                
                 nav_entry = {
                     'timestamp': datetime.now().isoformat(),
                     'operation': operation,
-                    'input': os.environ.get('TOOL_INPUT', '')
+                    'input_summary': self._summarize_input(),
+                    'input_hash': self._hash_input()
                 }
                 
-                with open(nav_log, 'a') as f:
-                    f.write(json.dumps(nav_entry) + '\n')
+                self._append_log('patterns', 'navigation', nav_entry, buffered=True)
             
             elif operation in ['replace_symbol_body', 'insert_before_symbol']:
                 # Track refactoring patterns
@@ -156,105 +860,248 @@ class MemoryManager:
         
         try:
             # Check cache first
-            if task_type in self.cache.get('contexts', {}):
-                cache_entry = self.cache['contexts'][task_type]
-                # Use cached context if fresh (< 10 minutes)
-                if time.time() - cache_entry.get('timestamp', 0) < 600:
-                    return cache_entry.get('data', {})
+            cached = self.context_cache.get(task_type)
+            if cached is not None:
+                return cached
             
             # Load fresh context
-            patterns_file = self.base_path / 'patterns' / f'{task_type}.json'
-            if patterns_file.exists():
-                with open(patterns_file, 'r') as f:
-                    context['patterns'] = json.load(f)
-            
-            decisions_file = self.base_path / 'decisions' / 'recent.json'
-            if decisions_file.exists():
-                with open(decisions_file, 'r') as f:
-                    context['decisions'] = json.load(f)
+            patterns = self._load_document('patterns', task_type)
+            if patterns is not None:
+                context['patterns'] = patterns
             
-            # Update cache
-            if 'contexts' not in self.cache:
-                self.cache['contexts'] = {}
+            decisions = self._load_document('decisions', 'recent')
+            if decisions is not None:
+                context['decisions'] = decisions
             
-            self.cache['contexts'][task_type] = {
-                'timestamp': time.time(),
-                'data': context
-            }
+            # Update cache, keyed to the files the context came from
+            self.context_cache.put(task_type, context, [
+                self.base_path / 'patterns' / f'{task_type}.json',
+                self.base_path / 'decisions' / 'recent.json'
+            ])
             
         except Exception:
             pass
         
         return context
     
+    def _recent_tasks(self, task_type: str, limit: int = 5) -> List[Dict]:
+        """Newest metrics of earlier tasks of this type (SQLite backend only)"""
+        if not self.store:
+            return []
+        try:
+            return self.store.records('tasks', 'metrics', task_type=task_type, limit=limit)
+        except Exception:
+            return []
+    
     def _save_patterns(self, patterns: List[Dict]):
         """Save discovered patterns for reuse"""
         try:
-            patterns_file = self.base_path / 'patterns' / 'discovered.json'
-            patterns_file.parent.mkdir(parents=True, exist_ok=True)
-            
-            existing = []
-            if patterns_file.exists():
-                with open(patterns_file, 'r') as f:
-                    existing = json.load(f)
+            added = self.pattern_index.add(patterns, self._hash_pattern)
             
-            # Deduplicate using pattern hashes
-            pattern_hashes = {self._hash_pattern(p) for p in existing}
+            if self.store:
+                for pattern in added:
+                    self.store.append_record('patterns', 'discovered', pattern)
             
-            for pattern in patterns:
-                pattern_hash = self._hash_pattern(pattern)
-                if pattern_hash not in pattern_hashes:
-                    existing.append(pattern)
-                    pattern_hashes.add(pattern_hash)
+            # Long-lived servers trim during idle maintenance; one-shot hooks amortize it
+            if self.pattern_index.needs_compaction(slack=self.pattern_index.retention // 2):
+                self._compact_patterns()
             
-            # Keep only recent patterns (last 100)
-            existing = existing[-100:]
+        except Exception:
+            pass
+    
+    def _compact_patterns(self):
+        """Apply pattern retention to the log, index and SQLite mirror"""
+        self.pattern_index.compact(self._hash_pattern)
+        if self.store:
+            self.store.trim_records('patterns', 'discovered', self.pattern_index.retention)
+    
+    def maintenance(self):
+        """Background housekeeping, run by the memory server while idle"""
+        try:
+            self.journal.flush_due()
+            self.context_cache.flush()
             
-            with open(patterns_file, 'w') as f:
-                json.dump(existing, f, indent=2)
+            self.pattern_index.refresh()
+            if self.pattern_index.needs_compaction():
+                self._compact_patterns()
             
+            # Forget span bookkeeping for tasks that never finished
+            for task_id, spans in list(self.cache.get('spans', {}).items()):
+                closed = spans.get('closed') or {}
+                times = list(spans.get('open', {}).values()) + [
+                    span[-1] for span in (closed.values() if isinstance(closed, dict) else closed)]
+                if not times or time.time() - max(times) > 24 * 3600:
+                    self._remove_cache(['spans', task_id])
         except Exception:
             pass
     
     def _track_refactoring(self, operation: str):
         """Track successful refactoring patterns"""
         try:
-            refactor_log = self.base_path / 'patterns' / 'refactorings.jsonl'
-            refactor_log.parent.mkdir(parents=True, exist_ok=True)
-            
             entry = {
                 'timestamp': datetime.now().isoformat(),
                 'operation': operation,
-                'input_summary': self._summarize_input()
+                'input_summary': self._summarize_input(),
+                'input_hash': self._hash_input()
             }
             
-            with open(refactor_log, 'a') as f:
-                f.write(json.dumps(entry) + '\n')
+            self._append_log('patterns', 'refactorings', entry, buffered=True)
             
         except Exception:
             pass
     
-    def _calculate_efficiency(self, metrics: Dict) -> int:
-        """Calculate parallel execution efficiency"""
-        try:
-            duration = metrics.get('duration_ms', 1000)
-            agents = metrics.get('agent_count', 1)
-            
-            # Ideal time would be duration/agents
-            ideal_time = duration / agents
-            
-            # Efficiency is how close we got to ideal
-            efficiency = int((ideal_time / duration) * 100)
+    def _load_document(self, category: str, name: str) -> Optional[Any]:
+        """Read a JSON memory document, via the SQLite index when enabled"""
+        source = self.base_path / category / f'{name}.json'
+        
+        if self.store:
+            return self.store.get_document_file(category, name, source)
+        
+        if source.exists():
+            with open(source, 'r') as f:
+                return json.load(f)
+        return None
+    
+    def _append_log(self, category: str, name: str, entry: Dict, buffered: bool = False):
+        """Append a record to a JSONL log, mirroring it into the SQLite store"""
+        log_file = self.base_path / category / f'{name}.jsonl'
+        
+        # High-volume logs are write-behind; the rest go out immediately
+        self.journal.append(log_file, entry)
+        if not buffered:
+            self.journal.flush(log_file)
+        
+        if self.store:
+            self.store.append_record(category, name, entry, task_type=entry.get('task_type'))
+    
+    def _span_identity(self, payload: Dict) -> Tuple[Optional[str], str]:
+        """Explicit batch id (None for the session's current batch), and this call's agent key
+
+        current_task.txt is rewritten by every Task call, so it cannot link a batch.
+        Without a tool-use id the agent is keyed by a hash of its description and
+        prompt, so parallel agents of one subagent_type stay apart.
+        """
+        batch = (os.environ.get('TASK_ID') or os.environ.get('PARENT_ID')
+                 or payload.get('task_id') or payload.get('parent_id'))
+        
+        agent = (os.environ.get('AGENT_ID') or os.environ.get('TOOL_USE_ID')
+                 or payload.get('agent_id') or payload.get('tool_use_id'))
+        if not agent:
+            described = json.dumps([payload.get('subagent_type'), payload.get('description'),
+                                    payload.get('prompt')], sort_keys=True)
+            agent = 'task-' + hashlib.md5(described.encode()).hexdigest()[:12]
+        return (str(batch) if batch else None), str(agent)
+    
+    def _session_batch(self, payload: Dict) -> str:
+        """The session's running batch, or a new one once none of its agents are open"""
+        session = os.environ.get('CLAUDE_SESSION_ID') or payload.get('session_id')
+        if not session:
+            try:
+                session = Path('/tmp/claude_session/session_id.txt').read_text().strip()
+            except OSError:
+                session = 'session'
+        
+        current = self.cache.get('span_batches', {}).get(session)
+        if current and self.cache.get('spans', {}).get(current, {}).get('open'):
+            return current
+        batch = f"{session}-{int(time.time() * 1000)}"
+        self._update_cache(['span_batches', session], batch)
+        return batch
+    
+    @contextlib.contextmanager
+    def _span_lock(self):
+        """Serialize span bookkeeping across hook processes, on a freshly replayed cache
+
+        Every change is a single per-agent key, and the cache catches up with the
+        log under the lock, so concurrent hooks never overwrite each other's spans.
+        """
+        self.base_path.mkdir(parents=True, exist_ok=True)
+        with open(self.base_path / 'spans.lock', 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                self.refresh_cache()
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+    
+    def _start_span(self, payload: Dict):
+        batch, agent = self._span_identity(payload)
+        with self._span_lock():
+            batch = batch or self._session_batch(payload)
+            self._update_cache(['spans', batch, 'open', agent], time.time())
+    
+    def _end_span(self, payload: Dict, reported: List[Dict] = (),
+                  collect: bool = True) -> Tuple[Optional[str], Optional[Dict]]:
+        """Close this call's span (plus any spans the tool reported); measure the batch if it is done"""
+        batch, agent = self._span_identity(payload)
+        with self._span_lock():
+            spans = self.cache.get('spans', {})
+            if batch is None:
+                batch = next((name for name, entry in spans.items()
+                              if agent in entry.get('open', {})), None)
+            if batch is None:
+                return None, None
             
-            return min(100, efficiency)  # Cap at 100%
+            start = spans.get(batch, {}).get('open', {}).get(agent)
+            if start is not None:
+                self._remove_cache(['spans', batch, 'open', agent])
+                self._record_span(batch, agent, start, time.time())
+            for i, span in enumerate(reported):
+                self._record_span(batch, str(span.get('agent_id') or f"{agent}-{i}"), span['start'], span['end'])
             
-        except:
-            return 100
+            return batch, (self._collect_parallelism(batch) if collect else None)
+    
+    def _record_span(self, task_id: str, agent_id: str, start: float, end: float):
+        """Close one agent span and log it for later analysis"""
+        self._update_cache(['spans', task_id, 'closed', agent_id], [start, end])
+        
+        self._append_log('tasks', 'spans', {
+            'timestamp': datetime.now().isoformat(),
+            'task_id': task_id,
+            'agent_id': agent_id,
+            'start': start,
+            'end': end
+        })
+    
+    def _collect_parallelism(self, task_id: str) -> Optional[Dict]:
+        """Measure a batch once none of its agents are still running (call under _span_lock)"""
+        spans = self.cache.get('spans', {}).get(task_id)
+        if not spans:
+            return None
+        
+        # Agents that never reported back (crashed, cancelled) stop blocking after an hour
+        if any(time.time() - start < 3600 for start in spans.get('open', {}).values()):
+            return None
+        
+        self._remove_cache(['spans', task_id])
+        closed = spans.get('closed')
+        closed = [span for span in closed.values() if len(span) == 2] if isinstance(closed, dict) else []
+        if len(closed) < 2:
+            return None
+        
+        return measure_parallelism(closed)
+    
+    def _parallelism_tip(self, parallelism: Dict) -> str:
+        """Explain low efficiency using the measured spans"""
+        summary = (f"{parallelism['efficiency']}% ({parallelism['speedup']}x speedup "
+                   f"on {parallelism['agent_count']} agents)")
+        
+        # One agent spanning the wall time means the others overlapped it but finished early
+        wall = parallelism['wall_ms']
+        if parallelism.get('longest_ms', 0) >= 0.9 * wall:
+            return f"💡 Tip: Parallel efficiency {summary} - one agent took {parallelism['longest_ms']}ms of {wall}ms; the work is imbalanced, split its share"
+        if parallelism['busy_ms'] <= 1.1 * wall:
+            return f"💡 Tip: Parallel efficiency {summary} - agents mostly ran back to back; split the work so they can overlap"
+        return f"💡 Tip: Parallel efficiency {summary} - critical path {parallelism['critical_path_ms']}ms, consider fewer agents"
     
     def _hash_pattern(self, pattern: Dict) -> str:
         """Generate hash for pattern deduplication"""
         pattern_str = json.dumps(pattern, sort_keys=True)
-        return hashlib.md5(pattern_str.encode()).hexdigest()[:8]
+        return hashlib.md5(pattern_str.encode()).hexdigest()[:16]
+    
+    def _hash_input(self) -> str:
+        """Stable key for the full tool input, so repeated queries group without storing them"""
+        return hashlib.md5(os.environ.get('TOOL_INPUT', '').encode()).hexdigest()[:12]
     
     def _summarize_input(self) -> str:
         """Create brief summary of tool input"""
@@ -271,7 +1118,7 @@ def main():
     manager = MemoryManager()
     
     if len(sys.argv) < 2:
-        print("Usage: memory_manager.py [init|pre_task|post_task|serena_sync]")
+        print("Usage: memory_manager.py [init|pre_task|post_task|span_start|span_end|serena_sync|compact|migrate|stats]")
         sys.exit(0)
     
     command = sys.argv[1]
@@ -282,8 +1129,18 @@ def main():
         manager.pre_task()
     elif command == 'post_task':
         manager.post_task()
+    elif command == 'span_start':
+        manager.span_start()
+    elif command == 'span_end':
+        manager.span_end()
     elif command == 'serena_sync':
         manager.serena_sync()
+    elif command == 'compact':
+        manager.compact()
+    elif command == 'migrate':
+        manager.migrate()
+    elif command == 'stats':
+        manager.stats()
     else:
         print(f"Unknown command: {command}")
 
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Memory Server - Long-lived MemoryManager behind a local Unix socket
+Keeps the cache and pattern indexes warm between Task hooks
+"""
+
+import contextlib
+import fcntl
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import time
+from pathlib import Path
+from typing import Dict
+
+from memory_client import is_request_env
+from memory_manager import MemoryManager
+
+SOCKET_PATH = os.environ.get('MEMORY_MANAGER_SOCKET', '.serena/memories/memory_manager.sock')
+IDLE_TIMEOUT = int(os.environ.get('MEMORY_MANAGER_IDLE_TIMEOUT', '600'))
+POLL_INTERVAL = 5
+
+
+class MemoryRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        """Serve one newline-delimited JSON request"""
+        try:
+            request = json.loads(self.rfile.readline() or b'{}')
+        except Exception:
+            request = {}
+
+        response = self.server.dispatch(request)
+
+        try:
+            self.wfile.write((json.dumps(response) + '\n').encode())
+        except Exception:
+            pass  # Client gave up - nothing to report
+
+
+class MemoryServer(socketserver.UnixStreamServer):
+    def __init__(self, socket_path: str = SOCKET_PATH, idle_timeout: int = IDLE_TIMEOUT):
+        self.manager = MemoryManager()
+        self.idle_timeout = idle_timeout
+        self.last_activity = time.time()
+        self.running = True
+        self.commands = {
+            'init': self.manager.init,
+            'pre_task': self.manager.pre_task,
+            'post_task': self.manager.post_task,
+            'span_start': self.manager.span_start,
+            'span_end': self.manager.span_end,
+            'serena_sync': self.manager.serena_sync,
+            'compact': self.manager.compact,
+            'migrate': self.manager.migrate,
+            'stats': self.manager.stats,
+        }
+        super().__init__(socket_path, MemoryRequestHandler)
+        self.timeout = min(POLL_INTERVAL, idle_timeout, self.manager.journal.max_delay)
+
+    def dispatch(self, request: Dict) -> Dict:
+        """Run a MemoryManager command with the caller's tool environment"""
+        self.last_activity = time.time()
+        command = request.get('command', '')
+
+        if command == 'ping':
+            return {'ok': True, 'pid': os.getpid()}
+        if command == 'stop':
+            self.running = False
+            return {'ok': True}
+        if command not in self.commands:
+            return {'ok': False, 'output': f"Unknown command: {command}\n"}
+
+        # Inline fallback runs may have logged cache changes while we were serving
+        self.manager.refresh_cache()
+
+        output = io.StringIO()
+        with self._tool_environment(request.get('env', {})):
+            with contextlib.redirect_stdout(output):
+                try:
+                    self.commands[command]()
+                except Exception:
+                    pass  # Commands are non-blocking by contract
+
+        return {'ok': True, 'output': output.getvalue()}
+
+    @contextlib.contextmanager
+    def _tool_environment(self, env: Dict):
+        """Temporarily expose the client's TOOL_* variables to the manager
+
+        Every per-call variable is cleared first, so nothing from an earlier
+        request or the server's own environment leaks into this one.
+        """
+        env = {key: value for key, value in env.items() if is_request_env(key)}
+        previous = {key: os.environ.get(key) for key in set(env) | set(filter(is_request_env, os.environ))}
+        for key in previous:
+            os.environ.pop(key, None)
+        os.environ.update({key: str(value) for key, value in env.items()})
+        try:
+            yield
+        finally:
+            for key, value in previous.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+
+    def handle_timeout(self):
+        """Run housekeeping while idle; shut down after the idle period"""
+        self.manager.refresh_cache()
+        self.manager.maintenance()
+        if time.time() - self.last_activity >= self.idle_timeout:
+            self.running = False
+
+    def serve_until_idle(self):
+        """Handle requests until stopped or idle"""
+        while self.running:
+            self.handle_request()
+
+
+def _acquire_lock(socket_path: Path):
+    """Hold an exclusive lock so only one server runs per project"""
+    lock_file = open(socket_path.with_suffix('.lock'), 'w')
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
+
+def _send(socket_path: Path, command: str) -> Dict:
+    """Send a control command to a running server"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(2)
+        client.connect(str(socket_path))
+        client.sendall((json.dumps({'command': command}) + '\n').encode())
+        return json.loads(client.makefile('rb').readline() or b'{}')
+
+
+def serve(socket_path: Path, idle_timeout: int):
+    """Run the server in the foreground"""
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+
+    lock = _acquire_lock(socket_path)
+    if lock is None:
+        print("Memory server already running")
+        return
+
+    try:
+        # We hold the lock, so any leftover socket belongs to a dead server
+        if socket_path.exists():
+            socket_path.unlink()
+
+        server = MemoryServer(str(socket_path), idle_timeout)
+        try:
+            server.serve_until_idle()
+        finally:
+            server.manager.journal.flush()
+            server.server_close()
+            with contextlib.suppress(OSError):
+                socket_path.unlink()
+    finally:
+        lock.close()
+
+
+def main():
+    """Main entry point"""
+    socket_path = Path(SOCKET_PATH)
+    command = sys.argv[1] if len(sys.argv) > 1 else 'start'
+
+    if command == 'start':
+        serve(socket_path, IDLE_TIMEOUT)
+    elif command in ('stop', 'status'):
+        try:
+            response = _send(socket_path, 'stop' if command == 'stop' else 'ping')
+            if command == 'stop':
+                print("✓ Memory server stopped")
+            else:
+                print(f"✓ Memory server running (pid {response.get('pid')})")
+        except OSError:
+            print("Memory server not running")
+    else:
+        print("Usage: memory_server.py [start|stop|status]")
+
+
+if __name__ == "__main__":
+    main()
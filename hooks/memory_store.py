@@ -0,0 +1,189 @@
+"""
+Memory Store - Indexed single-file SQLite backend for .serena/memories
+WAL mode so parallel hooks can read and write at once
+"""
+
+import json
+import sqlite3
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    category TEXT NOT NULL,
+    name TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    source_mtime REAL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (category, name)
+);
+CREATE INDEX IF NOT EXISTS idx_documents_timestamp ON documents (timestamp);
+
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    category TEXT NOT NULL,
+    name TEXT NOT NULL,
+    task_type TEXT,
+    timestamp REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_records_category ON records (category, name, timestamp);
+CREATE INDEX IF NOT EXISTS idx_records_task_type ON records (task_type, timestamp);
+CREATE INDEX IF NOT EXISTS idx_records_timestamp ON records (timestamp);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class SQLiteMemoryStore:
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Autocommit; each statement is its own short transaction
+        self.conn = sqlite3.connect(str(self.db_path), timeout=5, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+    def put_document(self, category: str, name: str, data: Any,
+                     source_mtime: Optional[float] = None):
+        """Insert or replace a whole JSON document"""
+        self.conn.execute(
+            'INSERT OR REPLACE INTO documents (category, name, timestamp, source_mtime, data) '
+            'VALUES (?, ?, ?, ?, ?)',
+            (category, name, time.time(), source_mtime, json.dumps(data))
+        )
+
+    def get_document(self, category: str, name: str) -> Optional[Any]:
+        """Indexed lookup of one document"""
+        row = self.conn.execute(
+            'SELECT data FROM documents WHERE category = ? AND name = ?',
+            (category, name)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_document_file(self, category: str, name: str, source: Path) -> Optional[Any]:
+        """Look up a document, re-importing its file if an external writer changed it"""
+        row = self.conn.execute(
+            'SELECT data, source_mtime FROM documents WHERE category = ? AND name = ?',
+            (category, name)
+        ).fetchone()
+
+        try:
+            mtime = source.stat().st_mtime
+        except OSError:
+            mtime = None
+
+        if mtime is not None and (row is None or row[1] is None or mtime > row[1]):
+            with open(source, 'r') as f:
+                data = json.load(f)
+            self.put_document(category, name, data, source_mtime=mtime)
+            return data
+
+        return json.loads(row[0]) if row else None
+
+    def append_record(self, category: str, name: str, record: Dict,
+                      task_type: Optional[str] = None):
+        """Append one log record (the JSONL equivalent)"""
+        self.conn.execute(
+            'INSERT INTO records (category, name, task_type, timestamp, data) VALUES (?, ?, ?, ?, ?)',
+            (category, name, task_type, _record_time(record), json.dumps(record))
+        )
+
+    def records(self, category: str, name: str, task_type: Optional[str] = None,
+                limit: int = 20) -> List[Dict]:
+        """Newest records of one log, optionally of one task type (uses idx_records_task_type)"""
+        if task_type is None:
+            rows = self.conn.execute(
+                'SELECT data FROM records WHERE category = ? AND name = ? ORDER BY id DESC LIMIT ?',
+                (category, name, limit))
+        else:
+            rows = self.conn.execute(
+                'SELECT data FROM records INDEXED BY idx_records_task_type '
+                'WHERE task_type = ? AND category = ? AND name = ? '
+                'ORDER BY timestamp DESC LIMIT ?',
+                (task_type, category, name, limit))
+        return [json.loads(data) for (data,) in rows]
+
+    def trim_records(self, category: str, name: str, keep: int):
+        """Delete all but the newest `keep` records of one log"""
+        self.conn.execute(
+            'DELETE FROM records WHERE category = ? AND name = ? AND id NOT IN '
+            '(SELECT id FROM records WHERE category = ? AND name = ? ORDER BY id DESC LIMIT ?)',
+            (category, name, category, name, keep)
+        )
+
+    def migrate(self, base_path: Path, categories: List[str]) -> Optional[Dict[str, int]]:
+        """One-shot import of the JSON/JSONL tree; None if already migrated
+
+        Log lines already mirrored here (SERENA_MEMORY_BACKEND=sqlite before
+        the migration) are matched by their JSON and not imported again.
+        """
+        if self.conn.execute("SELECT 1 FROM meta WHERE key = 'migrated_at'").fetchone():
+            return None
+
+        counts = {'documents': 0, 'records': 0}
+
+        self.conn.execute('BEGIN')
+        try:
+            for category in categories:
+                category_dir = base_path / category
+                if not category_dir.exists():
+                    continue
+
+                for source in sorted(category_dir.glob('*.json')):
+                    try:
+                        with open(source, 'r') as f:
+                            data = json.load(f)
+                    except Exception:
+                        continue
+                    self.put_document(category, source.stem, data,
+                                      source_mtime=source.stat().st_mtime)
+                    counts['documents'] += 1
+
+                for source in sorted(category_dir.glob('*.jsonl')):
+                    mirrored = Counter(data for (data,) in self.conn.execute(
+                        'SELECT data FROM records WHERE category = ? AND name = ?', (category, source.stem)))
+                    with open(source, 'r') as f:
+                        for line in f:
+                            try:
+                                record = json.loads(line)
+                            except Exception:
+                                continue
+                            data = json.dumps(record)
+                            if mirrored[data]:
+                                mirrored[data] -= 1
+                                continue
+                            task_type = record.get('task_type') if isinstance(record, dict) else None
+                            self.append_record(category, source.stem, record, task_type=task_type)
+                            counts['records'] += 1
+
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated_at', ?)",
+                (datetime.now().isoformat(),)
+            )
+            self.conn.execute('COMMIT')
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+
+        return counts
+
+    def close(self):
+        self.conn.close()
+
+
+def _record_time(record: Dict) -> float:
+    """Epoch seconds from a record's ISO timestamp, defaulting to now"""
+    try:
+        return datetime.fromisoformat(str(record['timestamp']).replace('Z', '')).timestamp()
+    except Exception:
+        return time.time()
+
@@ -0,0 +1,226 @@
+"""
+Metric Columns - Typed column storage for task metric records
+Backed by array, with vectorized NumPy paths when NumPy is installed
+"""
+
+import math
+from array import array
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+EPOCH = datetime(1970, 1, 1)
+NAN = float('nan')
+
+# Column name -> array typecode
+COLUMNS = {
+    'timestamp': 'd',         # Seconds since epoch of the record's wall-clock time (NaN if missing)
+    'duration_ms': 'd',
+    'agent_count': 'l',
+    'success': 'b',
+    'efficiency': 'd',        # NaN when the task had no measured spans
+    'speedup': 'd',
+    'critical_path_ms': 'd',
+    'task_type': 'l'          # Index into MetricColumns.types
+}
+
+
+class MetricColumns:
+    """One typed array per field instead of one dict per record"""
+
+    def __init__(self, types: Optional[List[str]] = None):
+        self.columns = {name: array(code) for name, code in COLUMNS.items()}
+        self.types = list(types or [])
+        self._type_codes = {name: code for code, name in enumerate(self.types)}
+
+    def __len__(self) -> int:
+        return len(self.columns['timestamp'])
+
+    def append(self, record: Dict):
+        """Add one metrics.jsonl record; raises ValueError/TypeError without adding anything"""
+        get = record.get
+        values = (
+            ('timestamp', parse_timestamp(get('timestamp'))),
+            ('duration_ms', _number(get('duration_ms', 0))),
+            ('agent_count', int(_number(get('agent_count', 1)))),
+            ('success', 1 if get('success', False) else 0),
+            ('efficiency', _number(get('efficiency', NAN))),
+            ('speedup', _number(get('speedup', 1.0))),
+            ('critical_path_ms', _number(get('critical_path_ms', 0))),
+            ('task_type', self._type_code(str(get('task_type', 'unknown'))))
+        )
+        columns = self.columns
+        for name, value in values:
+            columns[name].append(value)
+
+    def column(self, name: str):
+        """A column as a NumPy view when available, else the raw array"""
+        if np is not None:
+            return np.frombuffer(self.columns[name], dtype=self.columns[name].typecode)
+        return self.columns[name]
+
+    def select(self, indices: Iterable[int]) -> 'MetricColumns':
+        """New columns holding only the given rows"""
+        selected = MetricColumns(self.types)
+        indices = list(indices)
+        for name, values in self.columns.items():
+            selected.columns[name] = array(values.typecode, (values[i] for i in indices))
+        return selected
+
+    def extend(self, other: 'MetricColumns'):
+        """Append another batch's rows"""
+        codes = [self._type_code(name) for name in other.types]
+        for name, values in other.columns.items():
+            if name == 'task_type':
+                self.columns[name].extend(codes[code] for code in values)
+            else:
+                self.columns[name].extend(values)
+
+    def tail(self, count: int) -> 'MetricColumns':
+        """The last `count` rows"""
+        return self.select(range(max(0, len(self) - count), len(self)))
+
+    def rows(self, start: int = 0, stop: Optional[int] = None) -> List[Dict]:
+        """Build per-record dicts for a slice only"""
+        stop = len(self) if stop is None else stop
+        columns = self.columns
+        return [{
+            'timestamp': format_timestamp(columns['timestamp'][i]),
+            'efficiency': _plain(columns['efficiency'][i]),
+            'speedup': _plain(columns['speedup'][i]),
+            'critical_path_ms': _plain(columns['critical_path_ms'][i]),
+            'agent_count': columns['agent_count'][i]
+        } for i in range(start, stop)]
+
+    # Vectorized reductions
+
+    def positive_durations(self):
+        """Durations > 0, as an ndarray or list"""
+        durations = self.column('duration_ms')
+        if np is not None:
+            return durations[durations > 0]
+        return [value for value in durations if value > 0]
+
+    def duration_summary(self) -> Tuple[object, int, float, float, float]:
+        """Positive durations with their count, sum, min and max"""
+        durations = self.positive_durations()
+        if not len(durations):
+            return durations, 0, 0.0, 0.0, 0.0
+        if np is not None:
+            return (durations, int(durations.size), float(durations.sum()),
+                    float(durations.min()), float(durations.max()))
+        return durations, len(durations), float(sum(durations)), min(durations), max(durations)
+
+    def success_count(self) -> int:
+        if np is not None:
+            return int(np.count_nonzero(self.column('success')))
+        return sum(self.columns['success'])
+
+    def parallel_count(self) -> int:
+        agents = self.column('agent_count')
+        if np is not None:
+            return int(np.count_nonzero(agents > 1))
+        return sum(1 for value in agents if value > 1)
+
+    def hour_histogram(self) -> Dict[str, int]:
+        """Task count per hour of day ('HH:00')"""
+        timestamps = self.column('timestamp')
+        if np is not None:
+            valid = timestamps[~np.isnan(timestamps)]
+            counts = np.bincount((valid // 3600 % 24).astype(np.int64), minlength=24)
+            return {f"{hour:02d}:00": int(count) for hour, count in enumerate(counts) if count}
+
+        histogram: Dict[str, int] = {}
+        for value in timestamps:
+            if value == value:
+                label = f"{int(value // 3600 % 24):02d}:00"
+                histogram[label] = histogram.get(label, 0) + 1
+        return histogram
+
+    def duration_groups(self) -> Dict[str, object]:
+        """Positive durations grouped by 'task_type/N agents'"""
+        durations = self.column('duration_ms')
+        agents = self.column('agent_count')
+        types = self.column('task_type')
+
+        if np is not None:
+            positive = durations > 0
+            keys = types[positive].astype(np.int64) * 1_000_000 + agents[positive]
+            values = durations[positive]
+            groups = {}
+            for key in np.unique(keys):
+                label = f"{self.types[int(key // 1_000_000)]}/{int(key % 1_000_000)} agents"
+                groups[label] = values[keys == key]
+            return groups
+
+        groups: Dict[str, List[float]] = {}
+        for duration, agent_count, code in zip(durations, agents, types):
+            if duration > 0:
+                groups.setdefault(f"{self.types[code]}/{agent_count} agents", []).append(duration)
+        return groups
+
+    def measured_indices(self) -> List[int]:
+        """Rows that carry a measured efficiency"""
+        efficiency = self.column('efficiency')
+        if np is not None:
+            return np.flatnonzero(~np.isnan(efficiency)).tolist()
+        return [i for i, value in enumerate(efficiency) if value == value]
+
+    def to_dict(self) -> Dict:
+        return {'types': self.types,
+                'columns': {name: values.tolist() for name, values in self.columns.items()}}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'MetricColumns':
+        columns = cls(data.get('types', []))
+        for name, values in data.get('columns', {}).items():
+            if name in COLUMNS:
+                columns.columns[name] = array(COLUMNS[name], values)
+        return columns
+
+    def _type_code(self, name: str) -> int:
+        code = self._type_codes.get(name)
+        if code is None:
+            code = self._type_codes[name] = len(self.types)
+            self.types.append(name)
+        return code
+
+
+def parse_timestamp(timestamp) -> float:
+    """ISO timestamp -> seconds since epoch of its wall-clock fields (NaN if unusable)"""
+    if not timestamp:
+        return NAN
+    try:
+        dt = datetime.fromisoformat(str(timestamp).replace('Z', ''))
+        if dt.tzinfo is not None:
+            dt = dt.replace(tzinfo=None)
+        return (dt - EPOCH).total_seconds()
+    except ValueError:
+        return NAN
+
+
+def format_timestamp(value: float) -> Optional[str]:
+    """Inverse of parse_timestamp"""
+    if value != value:
+        return None
+    return (EPOCH + timedelta(seconds=value)).isoformat()
+
+
+def _number(value) -> float:
+    if type(value) in (int, float):
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _plain(value: float):
+    """Whole floats back to ints, as they were in the JSON"""
+    if math.isfinite(value) and value == int(value):
+        return int(value)
+    return value
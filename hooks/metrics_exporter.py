@@ -0,0 +1,249 @@
+"""
+Metrics Exporter - OpenMetrics endpoint for hook and task metrics
+Aggregates are updated from newly appended log bytes, never rescanned per scrape
+"""
+
+import bisect
+import os
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from live_metrics import LogTailer
+
+CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+# Histogram upper bounds in seconds
+DURATION_BUCKETS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600]
+HOOK_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5]
+
+# Written by process_mcp_queue.py, one record per run
+MCP_QUEUE_METRICS = os.environ.get('MCP_QUEUE_METRICS', '/tmp/claude_session/logs/mcp_queue_metrics.jsonl')
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus layout"""
+
+    def __init__(self, bounds: List[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def lines(self, name: str, labels: str = '') -> List[str]:
+        prefix = labels + ',' if labels else ''
+        lines, cumulative = [], 0
+        for bound, count in zip(self.bounds + ['+Inf'], self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+        suffix = f'{{{labels}}}' if labels else ''
+        lines.append(f'{name}_count{suffix} {self.count}')
+        lines.append(f'{name}_sum{suffix} {round(self.total, 6)}')
+        return lines
+
+
+class MetricsCollector:
+    """Incrementally maintained aggregates over the metric logs"""
+
+    def __init__(self, memory_base: Path, min_refresh: float = 1.0):
+        memory_base = Path(memory_base)
+        self.tailers = {
+            'tasks': LogTailer(memory_base / 'tasks' / 'metrics.jsonl'),
+            'context': LogTailer(memory_base / 'context' / 'optimization_metrics.jsonl'),
+            'navigation': LogTailer(memory_base / 'patterns' / 'navigation.jsonl'),
+            'hooks': LogTailer(memory_base / 'context' / 'hook_timings.jsonl'),
+            'mcp_queue': LogTailer(Path(MCP_QUEUE_METRICS))
+        }
+        self.min_refresh = min_refresh
+        self.last_refresh = 0.0
+        self.lock = threading.Lock()
+
+        self.tasks = 0
+        self.failures = 0
+        self.agents = 0
+        self.task_durations = Histogram(DURATION_BUCKETS)
+        self.context_samples = 0
+        self.context_last = 0.0
+        self.context_max = 0.0
+        self.navigation: Dict[str, int] = defaultdict(int)
+        self.hook_durations: Dict[Tuple[str, str], Histogram] = {}
+        self.mcp_queue: Dict[str, float] = defaultdict(float)
+        self.malformed: Dict[str, int] = {log: 0 for log in self.tailers}
+
+    def refresh(self):
+        """Fold in records appended since the previous refresh (at most once per min_refresh)"""
+        with self.lock:
+            if time.time() - self.last_refresh < self.min_refresh:
+                return
+            self.last_refresh = time.time()
+
+            for log, fold in (('tasks', self._fold_task), ('context', self._fold_context),
+                              ('navigation', self._fold_navigation), ('hooks', self._fold_hook),
+                              ('mcp_queue', self._fold_mcp_queue)):
+                for record in self.tailers[log].read():
+                    try:
+                        fold(record)
+                    except (TypeError, ValueError, AttributeError):
+                        # Already past the tailer offset: count it rather than fail the scrape
+                        self.malformed[log] += 1
+
+    # Each fold validates every field before touching an aggregate, so a bad record changes nothing
+
+    def _fold_task(self, record: Dict):
+        agents = _number(record.get('agent_count', 1))
+        duration = _number(record.get('duration_ms', 0))
+        self.tasks += 1
+        self.failures += 0 if record.get('success', False) else 1
+        self.agents += agents
+        if duration > 0:
+            self.task_durations.observe(duration / 1000)
+
+    def _fold_context(self, record: Dict):
+        usage = _number(record.get('usage_percent', 0))
+        self.context_samples += 1
+        self.context_last = usage
+        self.context_max = max(self.context_max, usage)
+
+    def _fold_navigation(self, record: Dict):
+        self.navigation[str(record.get('operation', 'unknown'))] += 1
+
+    def _fold_hook(self, record: Dict):
+        key = (str(record.get('hook', 'unknown')), str(record.get('command', '')))
+        duration = _number(record.get('duration_ms', 0))
+        if key not in self.hook_durations:
+            self.hook_durations[key] = Histogram(HOOK_BUCKETS)
+        self.hook_durations[key].observe(duration / 1000)
+
+    def _fold_mcp_queue(self, record: Dict):
+        values = {field: _number(record.get(field, 0))
+                  for field in ('read', 'sent', 'coalesced', 'failed', 'ops_per_s', 'lag_s', 'backlog_bytes')}
+        for field in ('read', 'sent', 'coalesced', 'failed'):
+            self.mcp_queue[field] += values[field]
+        for field in ('ops_per_s', 'lag_s', 'backlog_bytes'):
+            self.mcp_queue[field] = values[field]
+
+    def render(self) -> str:
+        """Current aggregates in OpenMetrics text format"""
+        with self.lock:
+            lines = [
+                '# TYPE claude_tasks counter',
+                '# HELP claude_tasks Tasks recorded by post_task.',
+                f'claude_tasks_total {self.tasks}',
+                '# TYPE claude_task_failures counter',
+                '# HELP claude_task_failures Tasks that did not report success.',
+                f'claude_task_failures_total {self.failures}',
+                '# TYPE claude_task_success_ratio gauge',
+                '# HELP claude_task_success_ratio Share of tasks that succeeded.',
+                f'claude_task_success_ratio {round(1 - self.failures / self.tasks, 4) if self.tasks else 0}',
+                '# TYPE claude_task_agents counter',
+                '# HELP claude_task_agents Agents used across all tasks.',
+                f'claude_task_agents_total {self.agents}',
+                '# TYPE claude_task_duration_seconds histogram',
+                '# UNIT claude_task_duration_seconds seconds',
+                '# HELP claude_task_duration_seconds Task duration.',
+                *self.task_durations.lines('claude_task_duration_seconds'),
+                '# TYPE claude_context_optimizations counter',
+                '# HELP claude_context_optimizations Context optimization runs.',
+                f'claude_context_optimizations_total {self.context_samples}',
+                '# TYPE claude_context_usage_percent gauge',
+                '# HELP claude_context_usage_percent Context usage at the last optimization.',
+                f'claude_context_usage_percent {self.context_last}',
+                '# TYPE claude_context_usage_max_percent gauge',
+                '# HELP claude_context_usage_max_percent Highest context usage seen.',
+                f'claude_context_usage_max_percent {self.context_max}',
+                '# TYPE claude_navigation_operations counter',
+                '# HELP claude_navigation_operations Serena navigation operations.',
+            ]
+            for operation, count in sorted(self.navigation.items()):
+                lines.append(f'claude_navigation_operations_total{{operation="{_escape(operation)}"}} {count}')
+
+            lines += [
+                '# TYPE claude_hook_duration_seconds histogram',
+                '# UNIT claude_hook_duration_seconds seconds',
+                '# HELP claude_hook_duration_seconds Hook execution time.',
+            ]
+            for (hook, command), histogram in sorted(self.hook_durations.items()):
+                labels = f'hook="{_escape(hook)}",command="{_escape(command)}"'
+                lines += histogram.lines('claude_hook_duration_seconds', labels)
+
+            queue = self.mcp_queue
+            lines += [
+                '# TYPE claude_mcp_queue_operations counter',
+                '# HELP claude_mcp_queue_operations Queued MCP operations by outcome.',
+                *(f'claude_mcp_queue_operations_total{{outcome="{field}"}} {int(queue[field])}'
+                  for field in ('read', 'sent', 'coalesced', 'failed')),
+                '# TYPE claude_mcp_queue_throughput gauge',
+                '# HELP claude_mcp_queue_throughput Operations per second in the last queue run.',
+                f'claude_mcp_queue_throughput {queue["ops_per_s"]}',
+                '# TYPE claude_mcp_queue_lag_seconds gauge',
+                '# UNIT claude_mcp_queue_lag_seconds seconds',
+                '# HELP claude_mcp_queue_lag_seconds Age of the oldest operation in the last queue run.',
+                f'claude_mcp_queue_lag_seconds {queue["lag_s"]}',
+                '# TYPE claude_mcp_queue_backlog_bytes gauge',
+                '# UNIT claude_mcp_queue_backlog_bytes bytes',
+                '# HELP claude_mcp_queue_backlog_bytes Queue bytes not yet delivered.',
+                f'claude_mcp_queue_backlog_bytes {int(queue["backlog_bytes"])}',
+                '# TYPE claude_log_records_malformed counter',
+                '# HELP claude_log_records_malformed Log lines skipped as unparseable or for non-numeric fields.',
+                *(f'claude_log_records_malformed_total{{log="{log}"}} {count + self.tailers[log].skipped}'
+                  for log, count in sorted(self.malformed.items())),
+                '# EOF'
+            ]
+            return '\n'.join(lines) + '\n'
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+
+        collector = self.server.collector
+        collector.refresh()
+        body = collector.render().encode()
+
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Scrapes every few seconds would flood the terminal
+
+
+def serve(memory_base: Path, port: int = 9464, host: str = '127.0.0.1'):
+    """Serve /metrics on localhost until interrupted"""
+    server = HTTPServer((host, port), MetricsHandler)
+    server.collector = MetricsCollector(memory_base)
+    server.collector.refresh()  # Read existing history once, up front
+
+    print(f"📈 Serving OpenMetrics on http://{host}:{port}/metrics (Ctrl-C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def _number(value) -> float:
+    """A finite JSON number or numeric string; ValueError for anything else"""
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError(f'not a number: {value!r}')
+    number = float(value)
+    if number != number or number in (float('inf'), float('-inf')):
+        raise ValueError(f'not finite: {value!r}')
+    return int(number) if number.is_integer() else number
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
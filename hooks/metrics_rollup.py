@@ -0,0 +1,249 @@
+"""
+Metrics Rollup - Minute/hour/day rollups of task and context metrics
+Maintained at write time so windowed queries never scan raw JSONL
+
+Buckets are aligned on the epoch, so hours and days start at UTC boundaries.
+"""
+
+import contextlib
+import json
+import random
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from quantile_sketch import QuantileSketch
+
+RESOLUTIONS = {'minute': 60, 'hour': 3600, 'day': 86400}
+
+# Seconds of history kept per resolution (None = forever)
+RETENTION = {'minute': 2 * 86400, 'hour': 90 * 86400, 'day': None}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollups (
+    resolution TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    task_count INTEGER NOT NULL DEFAULT 0,
+    success_count INTEGER NOT NULL DEFAULT 0,
+    agent_sum INTEGER NOT NULL DEFAULT 0,
+    duration_sketch TEXT,
+    context_count INTEGER NOT NULL DEFAULT 0,
+    context_sum REAL NOT NULL DEFAULT 0,
+    context_max REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (resolution, bucket)
+) WITHOUT ROWID;
+"""
+
+
+class RollupStore:
+    def __init__(self, db_path: Path, read_only: bool = False):
+        self.db_path = Path(db_path)
+        if read_only:
+            # Creates nothing next to the database; without a live WAL the file is complete
+            wal = Path(str(self.db_path) + '-wal').exists()
+            uri = self.db_path.resolve().as_uri() + ('?mode=ro' if wal else '?mode=ro&immutable=1')
+            self.conn = sqlite3.connect(uri, uri=True, timeout=5, isolation_level=None)
+        else:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self.conn = sqlite3.connect(str(self.db_path), timeout=5, isolation_level=None)
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA synchronous=NORMAL')
+            self.conn.executescript(SCHEMA)
+        self._pending: Optional[Dict[Tuple[str, int], Dict]] = None
+
+    def record_task(self, timestamp: float, duration_ms: float, success: bool, agent_count: int):
+        """Add one task to its minute, hour and day buckets"""
+        self._update(timestamp, lambda row: self._add_task(row, duration_ms, success, agent_count))
+
+    def record_context(self, timestamp: float, usage_percent: float):
+        """Add one context usage sample to its minute, hour and day buckets"""
+        def add(row: Dict):
+            row['context_count'] += 1
+            row['context_sum'] += usage_percent
+            row['context_max'] = max(row['context_max'], usage_percent)
+        self._update(timestamp, add)
+
+    def query(self, start: float, end: float) -> Dict:
+        """Summary of the buckets covering [start, end)"""
+        return self.summarize(self.aggregate(start, end))
+
+    def aggregate(self, start: float, end: float) -> Dict:
+        """Mergeable totals of [start, end) at the finest resolution still retained
+
+        A bucket counts where it starts: the one straddling start is left out and
+        the one straddling end is included, so back-to-back windows never overlap
+        and a window is never more than one bucket off its length.
+        """
+        resolution = self._resolution_for(start)
+
+        rows = self.conn.execute(
+            'SELECT * FROM rollups WHERE resolution = ? AND bucket >= ? AND bucket < ?',
+            (resolution, start, end)
+        ).fetchall()
+
+        total = dict(self._empty_row(), resolution=resolution)
+        for row in rows:
+            merge_rows(total, self._row_dict(row))
+        return total
+
+    def series(self, resolution: str, start: float, end: float) -> List[Tuple[int, Dict]]:
+        """Per-bucket summaries, oldest first"""
+        rows = self.conn.execute(
+            'SELECT * FROM rollups WHERE resolution = ? AND bucket >= ? AND bucket < ? ORDER BY bucket',
+            (resolution, start, end)
+        ).fetchall()
+        return [(row[1], self.summarize(self._row_dict(row))) for row in rows]
+
+    def merge_from(self, other: 'RollupStore'):
+        """Fold every bucket of another store into this one"""
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            for row in other.conn.execute('SELECT * FROM rollups'):
+                incoming = self._row_dict(row)
+                current = self._load_row(incoming['resolution'], incoming['bucket'])
+                merge_rows(current, incoming)
+                self._store_row(current)
+            self.conn.execute('COMMIT')
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+
+    @contextlib.contextmanager
+    def bulk(self):
+        """Accumulate updates in memory and write each touched bucket once"""
+        self._pending = {}
+        try:
+            yield self
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                for row in self._pending.values():
+                    self._store_row(row)
+                self.conn.execute('COMMIT')
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
+            self._prune(time.time())
+        finally:
+            self._pending = None
+
+    def close(self):
+        self.conn.close()
+
+    def _update(self, timestamp: float, apply):
+        """Read-modify-write all three buckets in one transaction"""
+        if self._pending is not None:
+            for resolution, size in RESOLUTIONS.items():
+                key = (resolution, int(timestamp // size * size))
+                if key not in self._pending:
+                    self._pending[key] = self._load_row(*key)
+                apply(self._pending[key])
+            return
+
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            for resolution, size in RESOLUTIONS.items():
+                row = self._load_row(resolution, int(timestamp // size * size))
+                apply(row)
+                self._store_row(row)
+            self.conn.execute('COMMIT')
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+
+        # Amortized retention sweep
+        if random.random() < 0.01:
+            self._prune(timestamp)
+
+    def _prune(self, now: float):
+        for resolution, keep in RETENTION.items():
+            if keep is not None:
+                self.conn.execute('DELETE FROM rollups WHERE resolution = ? AND bucket < ?',
+                                  (resolution, now - keep))
+
+    def _resolution_for(self, start: float) -> str:
+        for resolution, keep in RETENTION.items():
+            if keep is None or time.time() - start <= keep:
+                return resolution
+        return 'day'
+
+    def _add_task(self, row: Dict, duration_ms: float, success: bool, agent_count: int):
+        row['task_count'] += 1
+        row['success_count'] += 1 if success else 0
+        row['agent_sum'] += agent_count
+        if duration_ms > 0:
+            row['duration_sketch'].add(duration_ms)
+
+    def _load_row(self, resolution: str, bucket: int) -> Dict:
+        row = self.conn.execute(
+            'SELECT * FROM rollups WHERE resolution = ? AND bucket = ?', (resolution, bucket)
+        ).fetchone()
+        if row:
+            return self._row_dict(row)
+        return dict(self._empty_row(), resolution=resolution, bucket=bucket)
+
+    def _store_row(self, row: Dict):
+        self.conn.execute(
+            'INSERT OR REPLACE INTO rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (row['resolution'], row['bucket'], row['task_count'], row['success_count'],
+             row['agent_sum'], json.dumps(row['duration_sketch'].to_dict()),
+             row['context_count'], row['context_sum'], row['context_max'])
+        )
+
+    def _empty_row(self) -> Dict:
+        return {
+            'task_count': 0, 'success_count': 0, 'agent_sum': 0,
+            'duration_sketch': QuantileSketch(),
+            'context_count': 0, 'context_sum': 0.0, 'context_max': 0.0
+        }
+
+    @staticmethod
+    def summarize(row: Dict) -> Dict:
+        """Rates, averages and percentiles of a bucket or aggregate"""
+        tasks = row['task_count']
+        contexts = row['context_count']
+        return dict({
+            'resolution': row.get('resolution'),
+            'tasks': tasks,
+            'success_rate': int(row['success_count'] / tasks * 100) if tasks else 0,
+            'avg_agents': round(row['agent_sum'] / tasks, 2) if tasks else 0,
+            'context_samples': contexts,
+            'avg_context_usage': round(row['context_sum'] / contexts, 1) if contexts else 0,
+            'max_context_usage': row['context_max']
+        }, **{f"{label}_ms": value for label, value in row['duration_sketch'].percentiles().items()})
+
+    def _row_dict(self, row: Tuple) -> Dict:
+        return {
+            'resolution': row[0], 'bucket': row[1],
+            'task_count': row[2], 'success_count': row[3], 'agent_sum': row[4],
+            'duration_sketch': QuantileSketch.from_dict(json.loads(row[5])) if row[5] else QuantileSketch(),
+            'context_count': row[6], 'context_sum': row[7], 'context_max': row[8]
+        }
+
+
+def merge_rows(target: Dict, source: Dict):
+    """Fold one bucket or aggregate into another"""
+    for key in ('task_count', 'success_count', 'agent_sum', 'context_count', 'context_sum'):
+        target[key] += source[key]
+    target['context_max'] = max(target['context_max'], source['context_max'])
+    target['duration_sketch'].merge(source['duration_sketch'])
+
+
+def parse_window(window: str) -> float:
+    """'30m', '24h', '7d', '2w' -> seconds; ValueError with the expected format otherwise"""
+    units = {'m': 60, 'h': 3600, 'd': 86400, 'w': 7 * 86400}
+    try:
+        seconds = float(window[:-1]) * units[window[-1]]
+    except (ValueError, KeyError, IndexError):
+        seconds = 0
+    if not 0 < seconds < float('inf'):
+        raise ValueError(f"Invalid window {window!r}: use a positive number and m, h, d or w (e.g. 30m, 24h, 7d, 2w)")
+    return seconds
+
+
+def open_rollups(memory_base: Path) -> Optional[RollupStore]:
+    """Open the project's rollup store, None if unavailable"""
+    try:
+        return RollupStore(Path(memory_base) / 'rollups.db')
+    except Exception:
+        return None
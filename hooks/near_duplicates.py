@@ -0,0 +1,138 @@
+"""
+Near Duplicates - SimHash clustering of finding lines
+Lines that differ only in paths, numbers or a few words share one cluster
+"""
+
+import hashlib
+import re
+import sys
+from typing import Dict, Iterable, List, Optional
+
+HASH_BITS = 64
+BANDS = 4                       # max_distance < BANDS guarantees a shared band
+BAND_BITS = HASH_BITS // BANDS
+BAND_MASK = (1 << BAND_BITS) - 1
+LANE_BITS = 16                  # Per-bit counters; lines have far fewer than 65536 features
+
+# Variable parts of a line, replaced by placeholders before hashing
+_PATH = re.compile(r'(?:[a-z]:)?(?:[\w.~-]*[/\\])+[\w.-]*|\b[\w-]+\.(?:py|js|ts|tsx|jsx|json|md|go|rs|java|rb|sh|ya?ml|toml|txt|log)\b')
+_NUMBER = re.compile(r'\b0x[0-9a-f]+\b|\b[0-9a-f]*\d[0-9a-f]*\b|\d+')
+_WORD = re.compile(r'<\w+>|\w+')
+
+
+def normalize(text: str) -> str:
+    """Lowercased text with paths and numbers replaced by placeholders"""
+    text = _PATH.sub(' <path> ', str(text).lower())
+    text = _NUMBER.sub('<num>', text)
+    return ' '.join(_WORD.findall(text))
+
+
+class NearDuplicateClusters:
+    """Groups texts whose SimHash fingerprints are within max_distance bits
+
+    Exact normalized matches are a dict lookup; other texts are compared only
+    with clusters sharing one of BANDS fingerprint bands, so adding n texts
+    takes roughly linear time.
+    """
+
+    def __init__(self, max_distance: int = 3):
+        self.max_distance = min(max_distance, BANDS - 1)
+        self.exemplars: List[str] = []
+        self.counts: List[int] = []
+        self.fingerprints: List[int] = []
+        self.by_text: Dict[str, int] = {}
+        self.by_fingerprint: Dict[int, int] = {}
+        self.bands: List[Dict[int, List[int]]] = [{} for _ in range(BANDS)]
+        self._token_hashes: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.exemplars)
+
+    def add(self, text: str, count: int = 1, fingerprint: Optional[int] = None) -> int:
+        """Count text (count times) into its cluster; returns the cluster index
+
+        A fingerprint from clusters() can be passed back to skip rehashing.
+        """
+        cluster = self.by_fingerprint.get(fingerprint) if fingerprint is not None else None
+        if cluster is not None:
+            self.counts[cluster] += count
+            return cluster
+
+        normalized = normalize(text)
+        cluster = self.by_text.get(normalized)
+        if cluster is None:
+            if fingerprint is None:
+                fingerprint = self.fingerprint(normalized)
+            cluster = self._nearest(fingerprint)
+            if cluster is None:
+                cluster = self._new_cluster(str(text), fingerprint)
+            self.by_text[normalized] = cluster
+
+        self.counts[cluster] += count
+        return cluster
+
+    def add_all(self, texts: Iterable[str]):
+        for text in texts:
+            self.add(text)
+
+    def clusters(self, min_count: int = 1, limit: Optional[int] = None) -> List[Dict]:
+        """{'exemplar', 'count', 'fingerprint'} per cluster, most frequent first"""
+        return [{'exemplar': self.exemplars[i], 'count': self.counts[i], 'fingerprint': self.fingerprints[i]}
+                for i in self.ranked(min_count, limit)]
+
+    def ranked(self, min_count: int = 1, limit: Optional[int] = None) -> List[int]:
+        """Cluster indexes in the order clusters() lists them"""
+        ranked = sorted((i for i, count in enumerate(self.counts) if count >= min_count),
+                        key=lambda i: -self.counts[i])
+        return ranked[:limit]
+
+    def fingerprint(self, normalized: str) -> int:
+        """64-bit SimHash over word unigrams and bigrams"""
+        words = normalized.split()
+        features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        if not features:
+            return 0
+
+        # Each feature hash is cached with its bits spread into 16-bit lanes of
+        # one big int, so summing the features counts all 64 bit positions at once
+        total = 0
+        for feature in features:
+            spread = self._token_hashes.get(feature)
+            if spread is None:
+                value = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), 'big')
+                spread = sum(1 << (bit * LANE_BITS) for bit in range(HASH_BITS) if value >> bit & 1)
+                self._token_hashes[feature] = spread
+            total += spread
+
+        lanes = memoryview(total.to_bytes(HASH_BITS * LANE_BITS // 8, sys.byteorder)).cast('H')
+        return sum(1 << bit for bit, ones in enumerate(lanes) if ones * 2 > len(features))
+
+    def _nearest(self, fingerprint: int) -> Optional[int]:
+        best, best_distance = None, self.max_distance + 1
+        seen = set()
+        for band, buckets in enumerate(self.bands):
+            for cluster in buckets.get(fingerprint >> (band * BAND_BITS) & BAND_MASK, ()):
+                if cluster in seen:
+                    continue
+                seen.add(cluster)
+                distance = bin(fingerprint ^ self.fingerprints[cluster]).count('1')
+                if distance < best_distance:
+                    best, best_distance = cluster, distance
+        return best
+
+    def _new_cluster(self, exemplar: str, fingerprint: int) -> int:
+        cluster = len(self.exemplars)
+        self.exemplars.append(exemplar)
+        self.counts.append(0)
+        self.fingerprints.append(fingerprint)
+        self.by_fingerprint.setdefault(fingerprint, cluster)
+        for band, buckets in enumerate(self.bands):
+            buckets.setdefault(fingerprint >> (band * BAND_BITS) & BAND_MASK, []).append(cluster)
+        return cluster
+
+
+def cluster_texts(texts: Iterable[str], max_distance: int = 3) -> List[Dict]:
+    """Cluster texts in one call; see NearDuplicateClusters"""
+    clusters = NearDuplicateClusters(max_distance)
+    clusters.add_all(texts)
+    return clusters.clusters()
@@ -4,33 +4,472 @@ Performance Dashboard - Visualize memory manager and hook performance metrics
 Aggregates and displays performance insights from hook system
 """
 
+import contextlib
+import glob
+from abc import ABC, abstractmethod
 import json
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
-from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+from collections import defaultdict, deque
+
+import metrics_exporter
+from live_metrics import LiveWatcher
+from change_point import detect_change_point
+from metric_columns import MetricColumns, format_timestamp, parse_timestamp
+from metrics_rollup import RollupStore, merge_rows, parse_window
+from quantile_sketch import QuantileSketch
+
+
+class StreamAnalyzer(ABC):
+    """Consumes records of one source file in a single shared pass"""
+    name = ''
+    source = ''
+    version = 1  # Bump when the saved state layout changes
+    columnar = False  # True to receive MetricColumns batches instead of dicts
+
+    @abstractmethod
+    def feed(self, record: Dict):
+        """Fold in one record"""
+
+    @abstractmethod
+    def result(self) -> Dict:
+        """Report over everything fed so far"""
+
+    def to_state(self) -> Dict:
+        """JSON-serializable aggregate state for checkpointing"""
+        return {key: list(value) if isinstance(value, deque) else value
+                for key, value in vars(self).items()}
+
+    def from_state(self, state: Dict):
+        """Restore aggregate state saved by to_state"""
+        for key, value in state.items():
+            current = getattr(self, key, None)
+            if isinstance(current, deque):
+                value = deque(value, maxlen=current.maxlen)
+            elif isinstance(current, defaultdict):
+                current.update(value)
+                continue
+            setattr(self, key, value)
+
+
+class ColumnarAnalyzer(StreamAnalyzer):
+    """Analyzer fed MetricColumns batches of task records"""
+    columnar = True
+
+    @abstractmethod
+    def feed_columns(self, columns: MetricColumns):
+        """Fold in a batch of records"""
+
+    def feed(self, record: Dict):
+        columns = MetricColumns()
+        columns.append(record)
+        self.feed_columns(columns)
+
+
+class TaskPerformanceAnalyzer(ColumnarAnalyzer):
+    """Duration, success and parallel usage of tasks"""
+    name = 'task_performance'
+    source = 'tasks'
+    version = 3
+
+    def __init__(self):
+        self.sketch = QuantileSketch()
+        self.group_sketches: Dict[str, QuantileSketch] = {}
+        self.total = 0
+        self.successes = 0
+        self.parallel = 0
+        self.duration_count = 0
+        self.duration_sum = 0
+        self.duration_min = None
+        self.duration_max = None
+        self.distribution = defaultdict(int)
+
+    def feed_columns(self, columns: MetricColumns):
+        self.total += len(columns)
+
+        # Duration analysis
+        durations, count, total, low, high = columns.duration_summary()
+        if count:
+            low, high = _whole(low), _whole(high)
+            self.duration_count += count
+            self.duration_sum += total
+            self.duration_min = low if self.duration_min is None else min(self.duration_min, low)
+            self.duration_max = high if self.duration_max is None else max(self.duration_max, high)
+
+            # Tail latency per task type and agent count, in constant memory
+            self.sketch.add_many(durations)
+            for group, values in columns.duration_groups().items():
+                if group not in self.group_sketches:
+                    self.group_sketches[group] = QuantileSketch()
+                self.group_sketches[group].add_many(values)
+
+        # Success rate and parallel usage
+        self.successes += columns.success_count()
+        self.parallel += columns.parallel_count()
+
+        # Task distribution by hour
+        for hour, count in columns.hour_histogram().items():
+            self.distribution[hour] += count
+
+    def result(self) -> Dict:
+        analysis = {
+            'task_distribution': dict(self.distribution),
+            'duration_stats': {},
+            'success_rate': 0,
+            'parallel_usage': 0,
+            'total_tasks': self.total
+        }
+
+        if self.duration_count:
+            analysis['duration_stats'] = dict({
+                'avg_ms': int(self.duration_sum / self.duration_count),
+                'min_ms': self.duration_min,
+                'max_ms': self.duration_max,
+                'total_tasks': self.duration_count
+            }, **self._percentiles(self.sketch))
+            analysis['latency_by_group'] = {
+                group: dict({'count': sketch.count}, **self._percentiles(sketch))
+                for group, sketch in sorted(self.group_sketches.items())
+            }
+
+        if self.total > 0:
+            analysis['success_rate'] = int((self.successes / self.total) * 100)
+            analysis['parallel_usage'] = int((self.parallel / self.total) * 100)
+
+        return analysis
+
+    def merge(self, other: 'TaskPerformanceAnalyzer'):
+        """Fold in another project's aggregates"""
+        for key in ('total', 'successes', 'parallel', 'duration_count', 'duration_sum'):
+            setattr(self, key, getattr(self, key) + getattr(other, key))
+        for key, pick in (('duration_min', min), ('duration_max', max)):
+            values = [value for value in (getattr(self, key), getattr(other, key)) if value is not None]
+            setattr(self, key, pick(values) if values else None)
+        for hour, count in other.distribution.items():
+            self.distribution[hour] += count
+
+        self.sketch.merge(other.sketch)
+        for group, sketch in other.group_sketches.items():
+            if group in self.group_sketches:
+                self.group_sketches[group].merge(sketch)
+            else:
+                self.group_sketches[group] = sketch
+
+    def sketches(self) -> Dict[str, QuantileSketch]:
+        """Mergeable duration sketches: overall plus one per group"""
+        return dict(self.group_sketches, all=self.sketch)
+
+    def to_state(self) -> Dict:
+        state = super().to_state()
+        state['sketch'] = self.sketch.to_dict()
+        state['group_sketches'] = {group: sketch.to_dict() for group, sketch in self.group_sketches.items()}
+        return state
+
+    def from_state(self, state: Dict):
+        state = dict(state)
+        self.sketch = QuantileSketch.from_dict(state.pop('sketch'))
+        self.group_sketches = {group: QuantileSketch.from_dict(data)
+                               for group, data in state.pop('group_sketches').items()}
+        super().from_state(state)
+
+    def _percentiles(self, sketch: QuantileSketch) -> Dict[str, int]:
+        return {f"{label}_ms": value for label, value in sketch.percentiles().items()}
+
+
+class EfficiencyTrendAnalyzer(ColumnarAnalyzer):
+    """Measured parallel efficiency over time"""
+    name = 'efficiency_trends'
+    source = 'tasks'
+    version = 3
+    window = 100  # Points kept for efficiency_over_time
+    history = 200  # Points searched for a trend change
+
+    def __init__(self):
+        self.count = 0
+        self.best = None
+        self.worst = None
+        self.recent = deque(maxlen=20)
+        self.series = deque(maxlen=self.history)
+        self.over_time = MetricColumns()
+
+    def feed_columns(self, columns: MetricColumns):
+        # Only tasks with measured agent spans carry an efficiency
+        measured = columns.measured_indices()
+        if not measured:
+            return
+
+        efficiency = columns.columns['efficiency']
+        values = [_whole(efficiency[i]) for i in measured]
+        self.count += len(values)
+        self.best = max(values if self.best is None else values + [self.best])
+        self.worst = min(values if self.worst is None else values + [self.worst])
+        self.recent.extend(values[-self.recent.maxlen:])
+        self.series.extend(values[-self.history:])
+
+        # Only the shown window is kept, as columns; dicts are built in result()
+        timestamps = columns.columns['timestamp']
+        self.over_time.extend(columns.select(
+            i for i in measured[-self.window:] if timestamps[i] == timestamps[i]
+        ))
+        self.over_time = self.over_time.tail(self.window)
+
+    def recent_average(self) -> int:
+        """Average efficiency of the last 20 measured tasks"""
+        return int(sum(self.recent) / len(self.recent)) if self.recent else 0
+
+    def result(self) -> Dict:
+        analysis = {
+            'efficiency_over_time': self.over_time.rows(),
+            'best_efficiency': self.best or 0,
+            'worst_efficiency': 100 if self.worst is None else self.worst,
+            'trend': 'stable'
+        }
+
+        # Determine trend from a confident step change in the series
+        change = _significant_change(list(self.series))
+        if change:
+            analysis['trend'] = 'improving' if change['change_percent'] > 0 else 'declining'
+            analysis['trend_change'] = change
+
+        return analysis
+
+    def to_state(self) -> Dict:
+        state = super().to_state()
+        state['over_time'] = self.over_time.to_dict()
+        return state
+
+    def from_state(self, state: Dict):
+        state = dict(state)
+        self.over_time = MetricColumns.from_dict(state.pop('over_time'))
+        super().from_state(state)
+
+
+class RegressionAnalyzer(StreamAnalyzer):
+    """Step changes in a metric, found with CUSUM over fixed-size windows of records"""
+    metric = ''
+    window_size = 20  # Records per window
+    max_windows = 200
+
+    def __init__(self):
+        self.pending = []
+        self.pending_start = None
+        self.windows = deque(maxlen=self.max_windows)  # [start timestamp, window level]
+
+    def add(self, timestamp: float, value: float):
+        if not self.pending:
+            self.pending_start = timestamp
+        self.pending.append(value)
+        if len(self.pending) >= self.window_size:
+            self.windows.append([self.pending_start, self.level(self.pending)])
+            self.pending = []
+
+    @abstractmethod
+    def level(self, values: List[float]) -> float:
+        """Summary value of one full window"""
+
+    def result(self) -> Dict:
+        analysis = {'metric': self.metric, 'windows': len(self.windows), 'change_point': None}
+
+        change = _significant_change([level for _, level in self.windows])
+        if change:
+            since = self.windows[change.pop('index')][0]
+            analysis['change_point'] = dict(change, since=format_timestamp(since))
+
+        return analysis
+
+
+class DurationRegressionAnalyzer(ColumnarAnalyzer, RegressionAnalyzer):
+    """Shifts in median task duration"""
+    name = 'duration_regression'
+    source = 'tasks'
+    metric = 'task_duration'
+
+    def feed_columns(self, columns: MetricColumns):
+        timestamps = columns.columns['timestamp']
+        for i, duration in enumerate(columns.columns['duration_ms']):
+            if duration > 0 and timestamps[i] == timestamps[i]:
+                self.add(timestamps[i], duration)
+
+    def level(self, values: List[float]) -> float:
+        ordered = sorted(values)
+        return ordered[len(ordered) // 2]
+
+
+class ContextRegressionAnalyzer(RegressionAnalyzer):
+    """Shifts in mean context usage"""
+    name = 'context_regression'
+    source = 'context'
+    metric = 'context_usage'
+    window_size = 10
+
+    def feed(self, entry: Dict):
+        timestamp = parse_timestamp(entry.get('timestamp'))
+        usage = _usage(entry)
+        if timestamp == timestamp and usage is not None:
+            self.add(timestamp, usage)
+
+    def level(self, values: List[float]) -> float:
+        return sum(values) / len(values)
+
+
+class ContextUsageAnalyzer(StreamAnalyzer):
+    """Context optimization frequency and peaks"""
+    name = 'context_usage'
+    source = 'context'
+    max_peaks = 100  # Most recent peak events kept in the report
+
+    def __init__(self):
+        self.count = 0
+        self.usage_sum = 0
+        self.peak_count = 0
+        self.peaks = deque(maxlen=self.max_peaks)
+
+    def feed(self, entry: Dict):
+        usage = _usage(entry)
+        if usage is None:
+            return
+        self.count += 1
+        self.usage_sum += usage
+
+        # Peak usage times (>80%)
+        if usage > 80 and entry.get('timestamp'):
+            try:
+                dt = datetime.fromisoformat(entry['timestamp'].replace('Z', ''))
+                self.peak_count += 1
+                self.peaks.append({'time': dt.strftime('%H:%M'), 'usage': usage})
+            except:
+                pass
+
+    def merge(self, other: 'ContextUsageAnalyzer'):
+        """Fold in another project's aggregates"""
+        self.count += other.count
+        self.usage_sum += other.usage_sum
+        self.peak_count += other.peak_count
+        self.peaks.extend(other.peaks)
+
+    def result(self) -> Dict:
+        return {
+            'optimization_frequency': self.count,
+            'avg_context_usage': int(self.usage_sum / self.count) if self.count else 0,
+            'peak_usage_count': self.peak_count,
+            'peak_usage_times': list(self.peaks)
+        }
+
+
+class NavigationAnalyzer(StreamAnalyzer):
+    """Code navigation operations and frequency"""
+    name = 'navigation_patterns'
+    source = 'navigation'
 
-class PerformanceDashboard:
     def __init__(self):
-        self.memory_base = Path('.serena/memories')
+        self.total = 0
+        self.operations = defaultdict(int)
+        self.first_timestamp = None
+        self.last_timestamp = None
+
+    def feed(self, nav: Dict):
+        operation = str(nav.get('operation', 'unknown'))
+        self.total += 1
+        self.operations[operation] += 1
+
+        timestamp = nav.get('timestamp')
+        if timestamp:
+            if self.first_timestamp is None:
+                self.first_timestamp = timestamp
+            self.last_timestamp = timestamp
+
+    def merge(self, other: 'NavigationAnalyzer'):
+        """Fold in another project's aggregates"""
+        self.total += other.total
+        for operation, count in other.operations.items():
+            self.operations[operation] += count
+        firsts = [ts for ts in (self.first_timestamp, other.first_timestamp) if ts]
+        lasts = [ts for ts in (self.last_timestamp, other.last_timestamp) if ts]
+        self.first_timestamp = min(firsts) if firsts else None
+        self.last_timestamp = max(lasts) if lasts else None
+
+    def result(self) -> Dict:
+        analysis = {
+            'total_navigations': self.total,
+            'popular_operations': dict(self.operations),
+            'navigation_frequency': 0
+        }
+
+        # Calculate frequency (navigations per day)
+        if self.first_timestamp and self.last_timestamp:
+            try:
+                first_time = datetime.fromisoformat(self.first_timestamp.replace('Z', ''))
+                last_time = datetime.fromisoformat(self.last_timestamp.replace('Z', ''))
+                time_span_days = max(1, (last_time - first_time).days + 1)
+                analysis['navigation_frequency'] = int(self.total / time_span_days)
+            except:
+                pass
+
+        return analysis
+
+
+def _significant_change(values: List[float], min_percent: float = 10,
+                        min_confidence: float = 0.95) -> Optional[Dict]:
+    """A step change big and certain enough to report"""
+    change = detect_change_point(values)
+    if change and change['confidence'] >= min_confidence and abs(change['change_percent']) >= min_percent:
+        return change
+    return None
+
+
+def _usage(entry: Dict) -> Optional[float]:
+    """usage_percent as a finite number, or None if missing or malformed"""
+    usage = entry.get('usage_percent', 0)
+    if type(usage) not in (int, float) or usage != usage or usage in (float('inf'), float('-inf')):
+        return None
+    return usage
+
+
+def _whole(value: float):
+    """Whole floats back to ints, as they were in the JSON"""
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+class PerformanceDashboard:
+    def __init__(self, memory_base: Path = Path('.serena/memories'), read_only: bool = False):
+        self.memory_base = Path(memory_base)
+        self.read_only = read_only  # Resume from the saved checkpoint but never write one
         self.metrics_file = self.memory_base / 'tasks' / 'metrics.jsonl'
         self.context_file = self.memory_base / 'context' / 'optimization_metrics.jsonl'
         self.navigation_file = self.memory_base / 'patterns' / 'navigation.jsonl'
+        self.sources = {
+            'tasks': self.metrics_file,
+            'context': self.context_file,
+            'navigation': self.navigation_file
+        }
+        self.state_file = self.memory_base / 'context' / 'dashboard_state.json'
+        self.rollup_file = self.memory_base / 'rollups.db'
+        self.batch_rows = 65536  # Records per columnar batch
 
     def generate_dashboard(self) -> Dict:
         """Generate comprehensive performance dashboard"""
         try:
             print("📊 Generating performance dashboard...")
 
+            analyzers = self._run_analyzers()
+            results = {name: analyzer.result() for name, analyzer in analyzers.items()}
+
+            self.export_sketches(analyzers)
+
             dashboard = {
                 'generated_at': datetime.now().isoformat(),
-                'summary': self._generate_summary(),
-                'task_performance': self._analyze_task_performance(),
-                'context_usage': self._analyze_context_usage(),
-                'navigation_patterns': self._analyze_navigation_patterns(),
-                'efficiency_trends': self._analyze_efficiency_trends(),
+                'summary': self._generate_summary(analyzers),
+                'task_performance': results['task_performance'],
+                'context_usage': results['context_usage'],
+                'navigation_patterns': results['navigation_patterns'],
+                'efficiency_trends': results['efficiency_trends'],
+                'regressions': self._regressions(results),
+                'recent_activity': self.recent_activity(),
                 'recommendations': []
             }
 
@@ -42,7 +481,259 @@ class PerformanceDashboard:
         except Exception as e:
             return {'error': f"Dashboard generation failed: {e}"}
 
-    def _generate_summary(self) -> Dict:
+    def _create_analyzers(self) -> List[StreamAnalyzer]:
+        return [
+            TaskPerformanceAnalyzer(),
+            EfficiencyTrendAnalyzer(),
+            DurationRegressionAnalyzer(),
+            ContextUsageAnalyzer(),
+            ContextRegressionAnalyzer(),
+            NavigationAnalyzer()
+        ]
+
+    def _run_analyzers(self, sources: Optional[List[str]] = None) -> Dict[str, StreamAnalyzer]:
+        """Feed analyzers only the bytes appended since the last checkpoint"""
+        analyzers = self._create_analyzers()
+        state = self._load_state()
+
+        for source, path in self.sources.items():
+            if sources is not None and source not in sources:
+                continue
+
+            consumers = [analyzer for analyzer in analyzers if analyzer.source == source]
+            if not consumers:
+                continue
+
+            checkpoint = self._resume_source(source, path, consumers, state)
+            if checkpoint is None:
+                continue
+
+            feeds = [analyzer.feed for analyzer in consumers if not analyzer.columnar]
+            batch_feeds = [analyzer.feed_columns for analyzer in consumers if analyzer.columnar]
+            batch = MetricColumns()
+            for record in self._stream_records(path, checkpoint):
+                # A malformed record is skipped, never allowed to stall the checkpoint
+                for feed in feeds:
+                    try:
+                        feed(record)
+                    except (TypeError, ValueError, AttributeError, KeyError):
+                        pass
+                if batch_feeds:
+                    try:
+                        batch.append(record)
+                    except (TypeError, ValueError, OverflowError, AttributeError):
+                        continue
+                    if len(batch) >= self.batch_rows:
+                        self._feed_batch(batch_feeds, batch)
+                        batch = MetricColumns()
+            if len(batch):
+                self._feed_batch(batch_feeds, batch)
+
+            state['sources'][source] = checkpoint
+            for analyzer in consumers:
+                state['analyzers'][analyzer.name] = {
+                    'version': analyzer.version,
+                    'state': analyzer.to_state()
+                }
+
+        self._save_state(state)
+        return {analyzer.name: analyzer for analyzer in analyzers}
+
+    def _feed_batch(self, batch_feeds, batch: MetricColumns):
+        for feed in batch_feeds:
+            try:
+                feed(batch)
+            except (TypeError, ValueError, AttributeError, KeyError):
+                pass  # Rows are validated on append; never let one batch stall the checkpoint
+
+    def _resume_source(self, source: str, path: Path, consumers: List[StreamAnalyzer],
+                       state: Dict) -> Optional[Dict]:
+        """Restore analyzers from the checkpoint, or start over if the file was rotated"""
+        try:
+            stat = path.stat()
+        except OSError:
+            state['sources'].pop(source, None)
+            return None
+
+        fresh = {'inode': stat.st_ino, 'offset': 0, 'head': self._file_head(path)}
+        checkpoint = state['sources'].get(source)
+
+        # Rebuild on rotation (new inode), truncation (shrunk below our offset),
+        # rewrite in place (different first line) or an analyzer state change
+        if (not checkpoint
+                or checkpoint.get('inode') != stat.st_ino
+                or checkpoint.get('offset', 0) > stat.st_size
+                or checkpoint.get('head') != fresh['head']
+                or any(state['analyzers'].get(a.name, {}).get('version') != a.version for a in consumers)):
+            return fresh
+
+        for analyzer in consumers:
+            analyzer.from_state(state['analyzers'][analyzer.name]['state'])
+        return dict(checkpoint)
+
+    def _file_head(self, path: Path) -> str:
+        """First line of a file, used to recognize it across runs"""
+        with open(path, 'rb') as f:
+            return f.readline(256).decode(errors='replace')
+
+    def _stream_records(self, path: Path, checkpoint: Dict) -> Iterator[Dict]:
+        """Yield JSON records from the checkpoint offset, advancing it line by line"""
+        with open(path, 'rb') as f:
+            f.seek(checkpoint['offset'])
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # Partial line still being written - pick it up next run
+                checkpoint['offset'] += len(line)
+
+                try:
+                    record = json.loads(line)
+                except:
+                    continue
+                if isinstance(record, dict):
+                    yield record
+
+    def _load_state(self) -> Dict:
+        """Load saved aggregates and per-source byte offsets"""
+        try:
+            with open(self.state_file, 'r') as f:
+                state = json.load(f)
+            if 'sources' in state and 'analyzers' in state:
+                return state
+        except:
+            pass
+        return {'sources': {}, 'analyzers': {}}
+
+    def _save_state(self, state: Dict):
+        """Atomically write the checkpoint"""
+        if self.read_only:
+            return
+        try:
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.state_file.with_suffix('.tmp')
+            with open(tmp_file, 'w') as f:
+                json.dump(state, f)
+            os.replace(tmp_file, self.state_file)
+        except:
+            pass  # Next run just rebuilds
+
+    def export_sketches(self, analyzers: Dict[str, StreamAnalyzer]) -> Path:
+        """Write duration sketches to disk so other sessions and machines can merge them"""
+        sketch_file = self.memory_base / 'context' / 'latency_sketches.json'
+        sketches = analyzers['task_performance'].sketches()
+
+        sketch_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(sketch_file, 'w') as f:
+            json.dump({
+                'generated_at': datetime.now().isoformat(),
+                'project': str(Path.cwd()),
+                'sketches': {group: sketch.to_dict() for group, sketch in sketches.items()}
+            }, f)
+        return sketch_file
+
+    def merge_sketches(self, sketch_files: List[str]) -> Dict[str, QuantileSketch]:
+        """Merge this project's duration sketches with exported ones"""
+        merged = self._run_analyzers(['tasks'])['task_performance'].sketches()
+
+        for sketch_file in sketch_files:
+            with open(sketch_file, 'r') as f:
+                exported = json.load(f).get('sketches', {})
+            for group, data in exported.items():
+                sketch = QuantileSketch.from_dict(data)
+                if group in merged:
+                    merged[group].merge(sketch)
+                else:
+                    merged[group] = sketch
+
+        return merged
+
+    def rollup_window(self, window: str, offset: float = 0) -> Dict:
+        """Aggregate a trailing window ('24h', '7d', ...) from the rollups"""
+        end = datetime.now().timestamp() - offset
+        start = end - parse_window(window)
+
+        with self._rollups() as rollups:
+            summary = rollups.query(start, end)
+        summary['window'] = window
+        return summary
+
+    def compare_windows(self, window: str) -> Dict:
+        """The trailing window against the one before it (e.g. this week vs last week)"""
+        current = self.rollup_window(window)
+        previous = self.rollup_window(window, offset=parse_window(window))
+
+        changes = {}
+        for key in ('tasks', 'success_rate', 'avg_agents', 'p50_ms', 'p95_ms', 'p99_ms', 'avg_context_usage'):
+            if previous.get(key):
+                changes[key] = round((current[key] - previous[key]) / previous[key] * 100, 1)
+
+        return {'current': current, 'previous': previous, 'change_percent': changes}
+
+    def recent_activity(self) -> List[Dict]:
+        """Tasks per hour over the last 24 hours"""
+        if not self.rollup_file.exists():
+            return []
+
+        end = datetime.now().timestamp()
+        with self._rollups() as rollups:
+            series = rollups.series('hour', end - 86400, end)
+
+        return [
+            {
+                'hour': datetime.fromtimestamp(bucket, timezone.utc).strftime('%Y-%m-%d %H:00 UTC'),
+                'tasks': summary['tasks'],
+                'success_rate': summary['success_rate'],
+                'p95_ms': summary['p95_ms']
+            }
+            for bucket, summary in series if summary['tasks']
+        ]
+
+    def rebuild_rollups(self) -> int:
+        """Recreate the rollups from the raw logs (one-time backfill)"""
+        for suffix in ('', '-wal', '-shm'):
+            path = Path(str(self.rollup_file) + suffix)
+            if path.exists():
+                path.unlink()
+
+        count = 0
+        with self._rollups() as rollups, rollups.bulk():
+            if self.metrics_file.exists():
+                for record in self._stream_records(self.metrics_file, {'offset': 0}):
+                    rollups.record_task(
+                        self._record_time(record),
+                        record.get('duration_ms', 0),
+                        record.get('success', False),
+                        record.get('agent_count', 1)
+                    )
+                    count += 1
+            if self.context_file.exists():
+                for record in self._stream_records(self.context_file, {'offset': 0}):
+                    rollups.record_context(self._record_time(record), record.get('usage_percent', 0))
+                    count += 1
+        return count
+
+    @contextlib.contextmanager
+    def _rollups(self):
+        rollups = RollupStore(self.rollup_file, read_only=self.read_only)
+        try:
+            yield rollups
+        finally:
+            rollups.close()
+
+    def _record_time(self, record: Dict) -> float:
+        try:
+            timestamp = str(record['timestamp'])
+            if timestamp.endswith('Z'):
+                timestamp = timestamp[:-1] + '+00:00'  # fromisoformat only accepts 'Z' from 3.11 on
+            return datetime.fromisoformat(timestamp).timestamp()
+        except Exception:
+            return datetime.now().timestamp()
+
+    def reset_state(self):
+        """Forget the checkpoint so the next run re-reads all history"""
+        if self.state_file.exists():
+            self.state_file.unlink()
+
+    def _generate_summary(self, analyzers: Optional[Dict[str, StreamAnalyzer]] = None) -> Dict:
         """Generate high-level performance summary"""
         summary = {
             'total_tasks': 0,
@@ -53,37 +744,20 @@ class PerformanceDashboard:
         }
 
         try:
-            # Count total tasks
-            if self.metrics_file.exists():
-                with open(self.metrics_file, 'r') as f:
-                    lines = f.readlines()
-                    summary['total_tasks'] = len(lines)
-
-                    # Calculate average efficiency from recent tasks
-                    recent_efficiencies = []
-                    for line in lines[-20:]:  # Last 20 tasks
-                        try:
-                            task = json.loads(line)
-                            if task.get('agent_count', 1) > 1:
-                                # Calculate efficiency
-                                duration = task.get('duration_ms', 1000)
-                                agents = task.get('agent_count', 1)
-                                efficiency = min(100, int((duration / agents / duration) * 100))
-                                recent_efficiencies.append(efficiency)
-                        except:
-                            continue
-
-                    if recent_efficiencies:
-                        summary['avg_efficiency'] = int(sum(recent_efficiencies) / len(recent_efficiencies))
-
-            # Count context optimizations
-            if self.context_file.exists():
-                with open(self.context_file, 'r') as f:
-                    summary['total_context_optimizations'] = len(f.readlines())
+            if analyzers is None:
+                analyzers = self._run_analyzers(['tasks', 'context'])
+
+            summary['total_tasks'] = analyzers['task_performance'].total
+            summary['avg_efficiency'] = analyzers['efficiency_trends'].recent_average()
+            summary['total_context_optimizations'] = analyzers['context_usage'].count
 
             # Count active patterns
+            patterns_log = self.memory_base / 'patterns' / 'discovered.jsonl'
             patterns_file = self.memory_base / 'patterns' / 'discovered.json'
-            if patterns_file.exists():
+            if patterns_log.exists():
+                with open(patterns_log, 'r') as f:
+                    summary['active_patterns'] = sum(1 for _ in f)
+            elif patterns_file.exists():
                 with open(patterns_file, 'r') as f:
                     patterns = json.load(f)
                     summary['active_patterns'] = len(patterns)
@@ -103,231 +777,23 @@ class PerformanceDashboard:
 
         return summary
 
-    def _analyze_task_performance(self) -> Dict:
-        """Analyze task execution performance"""
-        analysis = {
-            'task_distribution': defaultdict(int),
-            'duration_stats': {},
-            'success_rate': 0,
-            'parallel_usage': 0
-        }
+    def _regressions(self, results: Dict) -> List[Dict]:
+        """Confident step changes in task duration and context usage"""
+        regressions = []
 
-        if not self.metrics_file.exists():
-            return analysis
+        change = results['duration_regression']['change_point']
+        if change:
+            direction = 'slower' if change['change_percent'] > 0 else 'faster'
+            regressions.append(dict(change, metric='task_duration', message=(
+                f"Tasks got {abs(change['change_percent'])}% {direction} starting at {change['since']}")))
 
-        try:
-            durations = []
-            success_count = 0
-            total_count = 0
-            parallel_count = 0
+        change = results['context_regression']['change_point']
+        if change:
+            direction = 'rose' if change['change_percent'] > 0 else 'fell'
+            regressions.append(dict(change, metric='context_usage', message=(
+                f"Context usage {direction} {abs(change['change_percent'])}% starting at {change['since']}")))
 
-            with open(self.metrics_file, 'r') as f:
-                for line in f:
-                    try:
-                        task = json.loads(line)
-                        total_count += 1
-
-                        # Duration analysis
-                        duration = task.get('duration_ms', 0)
-                        if duration > 0:
-                            durations.append(duration)
-
-                        # Success rate
-                        if task.get('success', False):
-                            success_count += 1
-
-                        # Parallel usage
-                        agent_count = task.get('agent_count', 1)
-                        if agent_count > 1:
-                            parallel_count += 1
-
-                        # Task distribution by hour
-                        timestamp = task.get('timestamp', '')
-                        if timestamp:
-                            try:
-                                dt = datetime.fromisoformat(timestamp.replace('Z', ''))
-                                hour = dt.hour
-                                analysis['task_distribution'][f"{hour:02d}:00"] += 1
-                            except:
-                                pass
-
-                    except:
-                        continue
-
-            # Calculate statistics
-            if durations:
-                analysis['duration_stats'] = {
-                    'avg_ms': int(sum(durations) / len(durations)),
-                    'min_ms': min(durations),
-                    'max_ms': max(durations),
-                    'total_tasks': len(durations)
-                }
-
-            if total_count > 0:
-                analysis['success_rate'] = int((success_count / total_count) * 100)
-                analysis['parallel_usage'] = int((parallel_count / total_count) * 100)
-
-        except Exception as e:
-            analysis['error'] = str(e)
-
-        return analysis
-
-    def _analyze_context_usage(self) -> Dict:
-        """Analyze context optimization patterns"""
-        analysis = {
-            'optimization_frequency': 0,
-            'avg_context_usage': 0,
-            'peak_usage_times': []
-        }
-
-        if not self.context_file.exists():
-            return analysis
-
-        try:
-            usage_data = []
-            timestamps = []
-
-            with open(self.context_file, 'r') as f:
-                for line in f:
-                    try:
-                        entry = json.loads(line)
-                        usage_percent = entry.get('usage_percent', 0)
-                        usage_data.append(usage_percent)
-
-                        timestamp = entry.get('timestamp', '')
-                        if timestamp:
-                            timestamps.append(timestamp)
-
-                    except:
-                        continue
-
-            if usage_data:
-                analysis['optimization_frequency'] = len(usage_data)
-                analysis['avg_context_usage'] = int(sum(usage_data) / len(usage_data))
-
-                # Find peak usage times (>80%)
-                for i, usage in enumerate(usage_data):
-                    if usage > 80 and i < len(timestamps):
-                        try:
-                            dt = datetime.fromisoformat(timestamps[i].replace('Z', ''))
-                            analysis['peak_usage_times'].append({
-                                'time': dt.strftime('%H:%M'),
-                                'usage': usage
-                            })
-                        except:
-                            continue
-
-        except Exception as e:
-            analysis['error'] = str(e)
-
-        return analysis
-
-    def _analyze_navigation_patterns(self) -> Dict:
-        """Analyze code navigation patterns"""
-        analysis = {
-            'total_navigations': 0,
-            'popular_operations': defaultdict(int),
-            'navigation_frequency': 0
-        }
-
-        if not self.navigation_file.exists():
-            return analysis
-
-        try:
-            with open(self.navigation_file, 'r') as f:
-                lines = f.readlines()
-                analysis['total_navigations'] = len(lines)
-
-                for line in lines:
-                    try:
-                        nav = json.loads(line)
-                        operation = nav.get('operation', 'unknown')
-                        analysis['popular_operations'][operation] += 1
-                    except:
-                        continue
-
-            # Calculate frequency (navigations per day)
-            if lines:
-                try:
-                    # Get time span from first to last navigation
-                    first_nav = json.loads(lines[0])
-                    last_nav = json.loads(lines[-1])
-
-                    first_time = datetime.fromisoformat(first_nav['timestamp'].replace('Z', ''))
-                    last_time = datetime.fromisoformat(last_nav['timestamp'].replace('Z', ''))
-
-                    time_span_days = max(1, (last_time - first_time).days + 1)
-                    analysis['navigation_frequency'] = int(len(lines) / time_span_days)
-
-                except:
-                    pass
-
-        except Exception as e:
-            analysis['error'] = str(e)
-
-        return analysis
-
-    def _analyze_efficiency_trends(self) -> Dict:
-        """Analyze parallel execution efficiency trends"""
-        analysis = {
-            'efficiency_over_time': [],
-            'best_efficiency': 0,
-            'worst_efficiency': 100,
-            'trend': 'stable'
-        }
-
-        if not self.metrics_file.exists():
-            return analysis
-
-        try:
-            efficiencies = []
-            recent_efficiencies = []
-
-            with open(self.metrics_file, 'r') as f:
-                for line in f:
-                    try:
-                        task = json.loads(line)
-                        agent_count = task.get('agent_count', 1)
-
-                        if agent_count > 1:
-                            # Calculate efficiency
-                            duration = task.get('duration_ms', 1000)
-                            ideal_time = duration / agent_count
-                            efficiency = min(100, int((ideal_time / duration) * 100))
-
-                            efficiencies.append(efficiency)
-                            timestamp = task.get('timestamp', '')
-
-                            if timestamp:
-                                analysis['efficiency_over_time'].append({
-                                    'timestamp': timestamp,
-                                    'efficiency': efficiency,
-                                    'agent_count': agent_count
-                                })
-
-                    except:
-                        continue
-
-            if efficiencies:
-                analysis['best_efficiency'] = max(efficiencies)
-                analysis['worst_efficiency'] = min(efficiencies)
-
-                # Determine trend (compare first and last 5 entries)
-                if len(efficiencies) >= 10:
-                    early_avg = sum(efficiencies[:5]) / 5
-                    recent_avg = sum(efficiencies[-5:]) / 5
-
-                    if recent_avg > early_avg + 10:
-                        analysis['trend'] = 'improving'
-                    elif recent_avg < early_avg - 10:
-                        analysis['trend'] = 'declining'
-                    else:
-                        analysis['trend'] = 'stable'
-
-        except Exception as e:
-            analysis['error'] = str(e)
-
-        return analysis
+        return regressions
 
     def _generate_recommendations(self, dashboard: Dict) -> List[str]:
         """Generate performance recommendations based on analysis"""
@@ -352,10 +818,14 @@ class PerformanceDashboard:
             if avg_usage > 85:
                 recommendations.append("🔄 High context usage detected - consider more frequent compaction")
 
-            peak_times = context_usage.get('peak_usage_times', [])
-            if len(peak_times) > 5:
+            if context_usage.get('peak_usage_count', 0) > 5:
                 recommendations.append("📊 Frequent context peaks - consider optimizing memory retention")
 
+            # Check step changes
+            for regression in dashboard.get('regressions', []):
+                if regression['change_percent'] > 0:
+                    recommendations.append(f"🚨 {regression['message']} - check what changed then")
+
             # Check efficiency trends
             efficiency = dashboard.get('efficiency_trends', {})
             trend = efficiency.get('trend', 'stable')
@@ -391,10 +861,191 @@ class PerformanceDashboard:
 
         return recommendations
 
+FLEET_ANALYZERS = ('task_performance', 'context_usage', 'navigation_patterns')
+FLEET_WINDOWS = ('24h', '7d')
+
+
+def find_projects(patterns: List[str]) -> List[Path]:
+    """Memory directories under the given roots or globs"""
+    bases = []
+    for pattern in patterns:
+        roots = [Path(match) for match in sorted(glob.glob(os.path.expanduser(pattern)))] \
+            if glob.has_magic(pattern) else [Path(os.path.expanduser(pattern))]
+        for root in roots:
+            for base in (root / '.serena' / 'memories', root):
+                if (base / 'tasks').is_dir() or (base / 'context').is_dir():
+                    if base.resolve() not in bases:
+                        bases.append(base.resolve())
+                    break
+    return bases
+
+
+def project_aggregates(memory_base: Path) -> Dict:
+    """Mergeable aggregates of one project (runs in a worker process)
+
+    Scanned projects are only read: no checkpoint or rollup files are created in them.
+    """
+    try:
+        dashboard = PerformanceDashboard(memory_base, read_only=True)
+        analyzers = dashboard._run_analyzers()
+        aggregates = {
+            'root': str(memory_base.parent.parent if memory_base.name == 'memories' else memory_base),
+            'analyzers': {name: analyzers[name] for name in FLEET_ANALYZERS},
+            'windows': {}
+        }
+
+        if dashboard.rollup_file.exists():
+            now = datetime.now().timestamp()
+            with dashboard._rollups() as rollups:
+                for window in FLEET_WINDOWS:
+                    aggregates['windows'][window] = rollups.aggregate(now - parse_window(window), now)
+
+        return aggregates
+    except Exception as e:
+        return {'root': str(memory_base), 'error': str(e)}
+
+
+def aggregate_fleet(patterns: List[str], workers: Optional[int] = None) -> Dict:
+    """Fleet-wide report: one worker process per project, aggregates merged here"""
+    bases = find_projects(patterns)
+    merged = {analyzer.name: analyzer for analyzer in PerformanceDashboard()._create_analyzers()
+              if analyzer.name in FLEET_ANALYZERS}
+    windows: Dict[str, Dict] = {}
+    projects, errors = [], []
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for aggregates in pool.map(project_aggregates, bases):
+            if 'error' in aggregates:
+                errors.append({'root': aggregates['root'], 'error': aggregates['error']})
+                continue
+
+            for name, analyzer in aggregates['analyzers'].items():
+                merged[name].merge(analyzer)
+            for window, row in aggregates['windows'].items():
+                if window in windows:
+                    merge_rows(windows[window], row)
+                else:
+                    windows[window] = row
+
+            tasks = aggregates['analyzers']['task_performance'].result()
+            projects.append({
+                'root': aggregates['root'],
+                'tasks': tasks['total_tasks'],
+                'success_rate': tasks['success_rate'],
+                'p95_ms': tasks['duration_stats'].get('p95_ms', 0)
+            })
+
+    return {
+        'generated_at': datetime.now().isoformat(),
+        'projects': projects,
+        'errors': errors,
+        'task_performance': merged['task_performance'].result(),
+        'context_usage': merged['context_usage'].result(),
+        'navigation_patterns': merged['navigation_patterns'].result(),
+        'windows': {window: dict(RollupStore.summarize(row), window=window)
+                    for window, row in windows.items()}
+    }
+
+
 def main():
     """Main entry point"""
     dashboard = PerformanceDashboard()
 
+    if len(sys.argv) > 1 and sys.argv[1] == 'rebuild':
+        dashboard.reset_state()
+
+    if len(sys.argv) > 1 and sys.argv[1] == 'latency':
+        # Percentiles merged across this project and any exported sketch files
+        merged = dashboard.merge_sketches(sys.argv[2:])
+        print("⏱️  Task latency (ms):")
+        for group, sketch in sorted(merged.items(), key=lambda item: item[0] != 'all'):
+            pct = sketch.percentiles()
+            print(f"   • {group}: n={sketch.count} p50={pct['p50']} p90={pct['p90']} "
+                  f"p95={pct['p95']} p99={pct['p99']} p99.9={pct['p999']}")
+        return
+
+    if len(sys.argv) > 1 and sys.argv[1] == 'watch':
+        # Live view: watch [interval seconds] [window, e.g. 5m]
+        interval = float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+        try:
+            window = parse_window(sys.argv[3]) if len(sys.argv) > 3 else 300
+        except ValueError as e:
+            print(f"❌ {e}")
+            return
+        LiveWatcher(dashboard.sources, interval=interval, window=window).run()
+        return
+
+    if len(sys.argv) > 1 and sys.argv[1] == 'aggregate':
+        # Fleet report: aggregate <root|glob>...
+        report = aggregate_fleet(sys.argv[2:] or ['.'])
+        task_perf = report['task_performance']
+        stats = task_perf.get('duration_stats', {})
+        print(f"🌐 Fleet Performance ({len(report['projects'])} projects)")
+        print("=" * 50)
+        print(f"   • Total Tasks: {task_perf['total_tasks']}")
+        print(f"   • Success Rate: {task_perf['success_rate']}%")
+        print(f"   • Parallel Usage: {task_perf['parallel_usage']}%")
+        print(f"   • Latency p50/p95/p99: {stats.get('p50_ms', 0)}/{stats.get('p95_ms', 0)}/{stats.get('p99_ms', 0)}ms")
+        print(f"   • Context Optimizations: {report['context_usage']['optimization_frequency']}")
+        print(f"   • Navigations: {report['navigation_patterns']['total_navigations']}")
+        for window, summary in report['windows'].items():
+            print(f"   • Last {window}: {summary['tasks']} tasks, p95 {summary['p95_ms']}ms")
+
+        print(f"\n📁 Projects:")
+        for project in sorted(report['projects'], key=lambda item: -item['tasks']):
+            print(f"   • {project['root']}: {project['tasks']} tasks, "
+                  f"{project['success_rate']}% success, p95 {project['p95_ms']}ms")
+        for error in report['errors']:
+            print(f"   ⚠️ {error['root']}: {error['error']}")
+
+        report_file = dashboard.memory_base / 'context' / 'fleet_dashboard.json'
+        report_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(report_file, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📝 Fleet report saved to {report_file}")
+        return
+
+    if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        # OpenMetrics endpoint: serve [port]
+        port = int(sys.argv[2]) if len(sys.argv) > 2 else int(os.environ.get('METRICS_PORT', '9464'))
+        metrics_exporter.serve(dashboard.memory_base, port)
+        return
+
+    if len(sys.argv) > 1 and sys.argv[1] == 'backfill':
+        count = dashboard.rebuild_rollups()
+        print(f"✓ Rebuilt rollups from {count} records")
+        return
+
+    if len(sys.argv) > 1 and sys.argv[1] == 'window':
+        window = sys.argv[2] if len(sys.argv) > 2 else '24h'
+        try:
+            stats = dashboard.rollup_window(window)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return
+        print(f"🕒 Last {window} ({stats['resolution']} rollups):")
+        print(f"   • Tasks: {stats['tasks']} ({stats['success_rate']}% success, {stats['avg_agents']} avg agents)")
+        print(f"   • Latency p50/p95/p99: {stats['p50_ms']}/{stats['p95_ms']}/{stats['p99_ms']}ms")
+        print(f"   • Context Usage: avg {stats['avg_context_usage']}%, max {stats['max_context_usage']}%")
+        return
+
+    if len(sys.argv) > 1 and sys.argv[1] == 'compare':
+        window = sys.argv[2] if len(sys.argv) > 2 else '7d'
+        try:
+            comparison = dashboard.compare_windows(window)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return
+        current, previous = comparison['current'], comparison['previous']
+        print(f"📅 Last {window} vs the {window} before:")
+        for key, label in (('tasks', 'Tasks'), ('success_rate', 'Success %'),
+                           ('p50_ms', 'p50 ms'), ('p95_ms', 'p95 ms'),
+                           ('avg_context_usage', 'Context %')):
+            change = comparison['change_percent'].get(key)
+            delta = f" ({change:+.1f}%)" if change is not None else ""
+            print(f"   • {label}: {previous[key]} → {current[key]}{delta}")
+        return
+
     if len(sys.argv) > 1 and sys.argv[1] == 'quick':
         print("⚡ Quick performance overview...")
         summary = dashboard._generate_summary()
@@ -429,6 +1080,7 @@ def main():
         print(f"\n⏱️  Task Performance:")
         stats = task_perf['duration_stats']
         print(f"   • Average Duration: {stats.get('avg_ms', 0)}ms")
+        print(f"   • Latency p50/p95/p99: {stats.get('p50_ms', 0)}/{stats.get('p95_ms', 0)}/{stats.get('p99_ms', 0)}ms")
         print(f"   • Success Rate: {task_perf.get('success_rate', 0)}%")
         print(f"   • Parallel Usage: {task_perf.get('parallel_usage', 0)}%")
 
@@ -438,7 +1090,7 @@ def main():
         print(f"\n🧠 Context Usage:")
         print(f"   • Optimizations: {context.get('optimization_frequency', 0)}")
         print(f"   • Average Usage: {context.get('avg_context_usage', 0)}%")
-        peak_count = len(context.get('peak_usage_times', []))
+        peak_count = context.get('peak_usage_count', 0)
         if peak_count > 0:
             print(f"   • Peak Usage Events: {peak_count}")
 
@@ -462,6 +1114,21 @@ def main():
         print(f"   • Worst Efficiency: {efficiency.get('worst_efficiency', 100)}%")
         print(f"   • Trend: {efficiency.get('trend', 'stable').capitalize()}")
 
+    # Last 24 hours
+    activity = report.get('recent_activity', [])
+    if activity:
+        print(f"\n🕒 Last 24h:")
+        print(f"   • Tasks: {sum(hour['tasks'] for hour in activity)} over {len(activity)} active hours")
+        busiest = max(activity, key=lambda hour: hour['tasks'])
+        print(f"   • Busiest Hour: {busiest['hour']} ({busiest['tasks']} tasks)")
+
+    # Step changes
+    regressions = report.get('regressions', [])
+    if regressions:
+        print(f"\n🚨 Change Points:")
+        for regression in regressions:
+            print(f"   • {regression['message']} ({int(regression['confidence'] * 100)}% confidence)")
+
     # Recommendations
     recommendations = report['recommendations']
     if recommendations:
@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Process MCP Queue - Deliver queued Serena operations in coalesced batches
+Consumes mcp_queue.jsonl from a durable cursor; repeated saves to a key collapse to the last write
+"""
+
+import argparse
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from queue_cursor import QueueCursor
+
+QUEUE_FILE = '/tmp/claude_session/mcp_queue.jsonl'
+BATCH_SIZE = int(os.environ.get('MCP_QUEUE_BATCH', '50'))
+WORKERS = int(os.environ.get('MCP_QUEUE_WORKERS', '4'))
+ATTEMPTS = 3
+
+# A fully consumed queue is sealed and rotated away once it grows past this (always with --final)
+COMPACT_BYTES = 1024 * 1024
+
+
+class FileBackend:
+    """Local stand-in for Serena: each memory is serena_cache/<namespace>/<key>.json"""
+
+    def __init__(self, store_dir: Path):
+        self.store_dir = Path(store_dir)
+
+    def send(self, operations: List[Dict]) -> List[Optional[Dict]]:
+        """Apply operations in order; loads return the stored data (or None)"""
+        return [self.apply(operation) for operation in operations]
+
+    def apply(self, operation: Dict):
+        params = operation.get('params', {})
+        path = self.store_dir / _safe(params.get('namespace')) / f"{_safe(params.get('key'))}.json"
+        if operation.get('operation') == 'save_memory':
+            _write_json(path, params.get('data'))
+            return None
+        if operation.get('operation') == 'load_memory':
+            try:
+                with open(path, 'r') as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                return None
+        return None  # Other MCP operations have no local equivalent
+
+
+class HttpBackend:
+    """POSTs each batch as {"operations": [...]} and expects {"results": [...]} back"""
+
+    def __init__(self, url: str, cache_dir: Path, timeout: float = 10):
+        self.url = url
+        self.cache = FileBackend(cache_dir)
+        self.timeout = timeout
+
+    def send(self, operations: List[Dict]) -> List[Optional[Dict]]:
+        request = urllib.request.Request(
+            self.url, data=json.dumps({'operations': operations}).encode(),
+            headers={'Content-Type': 'application/json'}, method='POST')
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            results = json.loads(response.read()).get('results', [])
+
+        # Mirror saves and load answers locally so load_from_serena can find them
+        for operation, result in zip(operations, results):
+            if operation.get('operation') == 'save_memory':
+                self.cache.apply(operation)
+            elif operation.get('operation') == 'load_memory' and result is not None:
+                self.cache.apply({'operation': 'save_memory',
+                                  'params': dict(operation.get('params', {}), data=result)})
+        return results
+
+
+class MCPBackend:
+    """Calls the queued tools on a Serena MCP server over one persistent stdio connection"""
+
+    def __init__(self, cache_dir: Path, command: Optional[str] = None):
+        from consolidate_to_serena import MCPClient, tool_data
+        self.client = MCPClient(command)
+        self.tool_data = tool_data
+        self.cache = FileBackend(cache_dir)
+
+    def send(self, operations: List[Dict]) -> List[Optional[Dict]]:
+        results = self.client.call_tools([(operation.get('operation'), operation.get('params', {}))
+                                          for operation in operations])
+
+        # Same local mirror as HttpBackend; loaded memories arrive as JSON text content
+        for i, operation in enumerate(operations):
+            if operation.get('operation') == 'save_memory':
+                self.cache.apply(operation)
+            elif operation.get('operation') == 'load_memory':
+                results[i] = self.tool_data(results[i])
+                if results[i] is not None:
+                    self.cache.apply({'operation': 'save_memory',
+                                      'params': dict(operation.get('params', {}), data=results[i])})
+        return results
+
+
+BACKENDS = {
+    'file': lambda args, cache_dir: FileBackend(cache_dir),
+    'http': lambda args, cache_dir: HttpBackend(args.url, cache_dir),
+    'mcp': lambda args, cache_dir: MCPBackend(cache_dir, args.mcp_command)
+}
+
+
+class QueueProcessor:
+    """Coalesces newly queued operations and sends them in concurrent batches"""
+
+    def __init__(self, queue_file: Path, backend, batch_size: int = BATCH_SIZE, workers: int = WORKERS):
+        self.queue_file = Path(queue_file)
+        self.backend = backend
+        self.batch_size = max(1, batch_size)
+        self.workers = max(1, workers)
+        self.cursor = QueueCursor(self.queue_file)
+        self.metrics_file = self.queue_file.parent / 'logs' / 'mcp_queue_metrics.jsonl'
+        self.dead_file = self.queue_file.with_suffix('.dead.jsonl')
+        self.retries_file = self.queue_file.with_name(self.queue_file.name + '.retries')
+
+    def run(self, final: bool = False) -> Dict:
+        """Deliver everything queued so far
+
+        The cursor only advances once every operation was delivered or dead-lettered:
+        an operation failing ATTEMPTS runs in a row moves to <queue>.dead.jsonl
+        instead of holding the queue back forever.
+        """
+        started = time.time()
+        records, position = self.cursor.read()
+        coalesced = coalesce(records)
+
+        # Skip operations already dead-lettered while the cursor waited on others
+        retries = self._load_retries()
+        operations = [op for op in coalesced if retries.get(_operation_key(op), 0) < ATTEMPTS]
+
+        # Saves go first so loads in the same run see them
+        saves = [op for op in operations if op.get('operation') == 'save_memory']
+        others = [op for op in operations if op.get('operation') != 'save_memory']
+        failed = self._send_all(saves) + self._send_all(others)
+
+        exhausted = []
+        for operation in failed:
+            key = _operation_key(operation)
+            retries[key] = retries.get(key, 0) + 1
+            if retries[key] >= ATTEMPTS:
+                exhausted.append(operation)
+
+        # Last chance one by one, so only the operations that fail on their own are set aside
+        dead = self._send_each(exhausted)
+        self._dead_letter(dead)
+        failed = [op for op in failed if op not in exhausted] + dead
+
+        pending = len(failed) - len(dead)
+        if not pending:
+            self.cursor.commit(position)
+            if final or self.cursor.offset >= COMPACT_BYTES:
+                self.cursor.rotate()
+            retries = {}
+        else:
+            keep = {_operation_key(op) for op in coalesced}
+            retries = {key: count for key, count in retries.items() if key in keep}
+        self._save_retries(retries)
+
+        elapsed = time.time() - started
+        sent = len(operations) - len(failed)
+        stats = {
+            'timestamp': datetime.now().isoformat(),
+            'read': len(records),
+            'sent': sent,
+            'coalesced': len(records) - len(coalesced),
+            'failed': pending,
+            'dead_lettered': len(dead),
+            'duration_ms': int(elapsed * 1000),
+            'ops_per_s': round(sent / elapsed, 1) if elapsed else 0,
+            'lag_s': _oldest_age(records, started),
+            'backlog_bytes': self.cursor.backlog_bytes()
+        }
+        self._record(stats)
+        return stats
+
+    def _send_all(self, operations: List[Dict]) -> List[Dict]:
+        """Operations whose batch failed every attempt"""
+        batches = [operations[i:i + self.batch_size] for i in range(0, len(operations), self.batch_size)]
+        if not batches:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(batches))) as pool:
+            return [operation for failed in pool.map(self._send_batch, batches) for operation in failed]
+
+    def _send_batch(self, batch: List[Dict]) -> List[Dict]:
+        for attempt in range(ATTEMPTS):
+            try:
+                self.backend.send(batch)
+                return []
+            except Exception:
+                time.sleep(0.1 * 2 ** attempt)
+        return batch
+
+    def _send_each(self, operations: List[Dict]) -> List[Dict]:
+        """Operations that still fail when sent alone"""
+        failed = []
+        for operation in operations:
+            try:
+                self.backend.send([operation])
+            except Exception:
+                failed.append(operation)
+        return failed
+
+    def _dead_letter(self, operations: List[Dict]):
+        if not operations:
+            return
+        with open(self.dead_file, 'a') as f:
+            f.write(''.join(json.dumps(operation) + '\n' for operation in operations))
+
+    def _load_retries(self) -> Dict[str, int]:
+        """Failed runs per operation since the cursor last advanced"""
+        try:
+            with open(self.retries_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_retries(self, retries: Dict[str, int]):
+        if not retries:
+            with contextlib.suppress(OSError):
+                os.unlink(self.retries_file)
+            return
+        _write_json(self.retries_file, retries)
+
+    def _record(self, stats: Dict):
+        try:
+            self.metrics_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.metrics_file, 'a') as f:
+                f.write(json.dumps(stats) + '\n')
+        except OSError:
+            pass
+
+
+def coalesce(records: List[Dict]) -> List[Dict]:
+    """Last save per namespace/key, one load per key not saved in the same run"""
+    saves: Dict[Tuple, Dict] = {}
+    loads: Dict[Tuple, Dict] = {}
+    others = []
+    for record in records:
+        params = record.get('params', {})
+        key = (record.get('server'), params.get('namespace'), params.get('key'))
+        if record.get('operation') == 'save_memory':
+            saves.pop(key, None)  # Re-insert so order follows the last write
+            saves[key] = record
+        elif record.get('operation') == 'load_memory':
+            loads.setdefault(key, record)
+        else:
+            others.append(record)
+
+    return list(saves.values()) + [load for key, load in loads.items() if key not in saves] + others
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Local stand-in for a Serena HTTP bridge, backed by a FileBackend"""
+
+    def do_POST(self):
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            results = self.server.store.send(body.get('operations', []))
+            payload, status = json.dumps({'results': results}).encode(), 200
+        except Exception as e:
+            payload, status = json.dumps({'error': str(e)}).encode(), 400
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(store_dir: Path, port: int, host: str = '127.0.0.1'):
+    """Run the stand-in server until interrupted"""
+    server = HTTPServer((host, port), StandInHandler)
+    server.store = FileBackend(store_dir)
+    print(f"🗄️  Stand-in Serena store on http://{host}:{port} ({store_dir})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def _oldest_age(records: List[Dict], now: float) -> float:
+    """Seconds since the oldest record in this run was queued"""
+    oldest = None
+    for record in records:
+        queued = record.get('timestamp') or record.get('params', {}).get('timestamp')
+        try:
+            queued = datetime.fromisoformat(str(queued)).timestamp()
+        except ValueError:
+            continue
+        oldest = queued if oldest is None else min(oldest, queued)
+    return round(max(0.0, now - oldest), 1) if oldest is not None else 0
+
+
+def _operation_key(operation: Dict) -> str:
+    return hashlib.md5(json.dumps(operation, sort_keys=True).encode()).hexdigest()
+
+
+def _safe(name) -> str:
+    return str(name or 'default').replace('/', '_').replace('\\', '_')
+
+
+def _write_json(path: Path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(temp, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(temp, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Deliver queued Serena MCP operations')
+    parser.add_argument('--queue-file', default=QUEUE_FILE, help='Queue written by the synthesizer')
+    parser.add_argument('--final', action='store_true', help='End of session: also retire the consumed queue')
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default=os.environ.get('MCP_QUEUE_BACKEND', 'file'),
+                        help='Where operations are delivered')
+    parser.add_argument('--url', default=os.environ.get('MCP_QUEUE_URL', 'http://127.0.0.1:8765'),
+                        help='Endpoint for the http backend')
+    parser.add_argument('--mcp-command', help='Server command for the mcp backend (default SERENA_MCP_COMMAND)')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Operations per request')
+    parser.add_argument('--workers', type=int, default=WORKERS, help='Batches in flight at once')
+    parser.add_argument('--serve', type=int, metavar='PORT',
+                        help='Run a local stand-in server for the http backend instead')
+    parser.add_argument('--store-dir', help='Where the stand-in server keeps memories (default serena_cache)')
+    args = parser.parse_args()
+
+    queue_file = Path(args.queue_file)
+    cache_dir = queue_file.parent / 'serena_cache'
+
+    if args.serve:
+        serve(Path(args.store_dir) if args.store_dir else cache_dir, args.serve)
+        return
+
+    # One processor per queue at a time
+    queue_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(queue_file.with_name(queue_file.name + '.lock'), 'w') as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            print("MCP queue already being processed")
+            return
+
+        processor = QueueProcessor(queue_file, BACKENDS[args.backend](args, cache_dir),
+                                   args.batch_size, args.workers)
+        stats = processor.run(final=args.final)
+
+    print(f"📬 MCP queue: {stats['read']} read, {stats['coalesced']} coalesced, "
+          f"{stats['sent']} sent in {stats['duration_ms']}ms ({stats['ops_per_s']} ops/s), "
+          f"lag {stats['lag_s']}s")
+    if stats['dead_lettered']:
+        print(f"⚠️ {stats['dead_lettered']} operations failed {ATTEMPTS} runs; moved to {processor.dead_file}")
+    if stats['failed']:
+        print(f"⚠️ {stats['failed']} operations failed; they stay queued")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
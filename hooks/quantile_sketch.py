@@ -0,0 +1,162 @@
+"""
+Quantile Sketch - Mergeable log-bucketed histogram for latency percentiles
+Constant memory with bounded relative error (DDSketch-style)
+"""
+
+import math
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class QuantileSketch:
+    """Counts values in logarithmic buckets; any quantile is within relative_accuracy"""
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def add(self, value: float, weight: int = 1):
+        """Record a value (non-positive values land in the zero bucket)"""
+        if value <= 0:
+            self.zero_count += weight
+        else:
+            key = math.ceil(math.log(value) / self.log_gamma)
+            self.buckets[key] = self.buckets.get(key, 0) + weight
+            if len(self.buckets) > self.max_buckets:
+                self._collapse()
+
+        self.count += weight
+        self.total += value * weight
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def add_many(self, values: Iterable[float]):
+        """Record a batch of values; bucket keys are computed in one vectorized pass with NumPy"""
+        if np is None:
+            values = list(values)
+            if not values:
+                return
+            log, ceil, log_gamma = math.log, math.ceil, self.log_gamma
+            buckets = self.buckets
+            for value in values:
+                if value > 0:
+                    key = ceil(log(value) / log_gamma)
+                    buckets[key] = buckets.get(key, 0) + 1
+                else:
+                    self.zero_count += 1
+            if len(buckets) > self.max_buckets:
+                self._collapse()
+
+            self.count += len(values)
+            self.total += sum(values)
+            low, high = min(values), max(values)
+            self.min = low if self.min is None else min(self.min, low)
+            self.max = high if self.max is None else max(self.max, high)
+            return
+
+        values = np.asarray(values, dtype=np.float64)
+        if values.size == 0:
+            return
+
+        positive = values[values > 0]
+        keys, counts = np.unique(np.ceil(np.log(positive) / self.log_gamma).astype(np.int64),
+                                 return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+        self.zero_count += int(values.size - positive.size)
+        self.count += int(values.size)
+        self.total += float(values.sum())
+        low, high = float(values.min()), float(values.max())
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+
+    def merge(self, other: 'QuantileSketch'):
+        """Fold another sketch with the same accuracy into this one"""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different accuracy")
+
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        for bound in (other.min, other.max):
+            if bound is not None:
+                self.min = bound if self.min is None else min(self.min, bound)
+                self.max = bound if self.max is None else max(self.max, bound)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimated value at quantile q in [0, 1]"""
+        if self.count == 0:
+            return None
+
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                estimate = 2 * self.gamma ** key / (self.gamma + 1)
+                return min(max(estimate, self.min), self.max)
+
+        return self.max
+
+    def percentiles(self, quantiles: List[float] = (0.5, 0.9, 0.95, 0.99, 0.999)) -> Dict[str, int]:
+        """Report p50/p90/... keys rounded to whole units"""
+        report = {}
+        for q in quantiles:
+            label = f"p{q * 100:g}".replace('.', '')
+            value = self.quantile(q)
+            report[label] = int(round(value)) if value is not None else 0
+        return report
+
+    def _collapse(self):
+        """Merge the lowest buckets so memory stays bounded; only low quantiles lose accuracy"""
+        keys = sorted(self.buckets)
+        overflow = len(keys) - self.max_buckets
+        target = keys[overflow]
+        for key in keys[:overflow]:
+            self.buckets[target] += self.buckets.pop(key)
+
+    def to_dict(self) -> Dict:
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'max_buckets': self.max_buckets,
+            'buckets': {str(key): count for key, count in self.buckets.items()},
+            'zero_count': self.zero_count,
+            'count': self.count,
+            'total': self.total,
+            'min': self.min,
+            'max': self.max
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'QuantileSketch':
+        sketch = cls(data.get('relative_accuracy', 0.01), data.get('max_buckets', 2048))
+        sketch.buckets = {int(key): count for key, count in data.get('buckets', {}).items()}
+        sketch.zero_count = data.get('zero_count', 0)
+        sketch.count = data.get('count', 0)
+        sketch.total = data.get('total', 0.0)
+        sketch.min = data.get('min')
+        sketch.max = data.get('max')
+        return sketch
@@ -0,0 +1,111 @@
+"""
+Queue Cursor - Committed byte offset into an append-only JSONL file
+Consumers read only records past the cursor and rotate consumed files away by rename
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# A sealed segment is deleted once drained and untouched for this long,
+# so writers that opened it just before the rename have finished
+SEAL_GRACE = 2.0
+
+
+class QueueCursor:
+    """Byte offset into a queue file, persisted next to it as <name>.cursor
+
+    rotate() renames a fully consumed file to <name>.sealed; writers then
+    start a fresh file. Lines that reach the sealed file after the rename
+    are read first on the next pass, and the segment is removed once drained.
+    """
+
+    def __init__(self, queue_file: Path):
+        self.queue_file = Path(queue_file)
+        self.path = self.queue_file.with_name(self.queue_file.name + '.cursor')
+        self.sealed_file = self.queue_file.with_name(self.queue_file.name + '.sealed')
+        self.inode = None
+        self.offset = 0
+        self.sealed_offset: Optional[int] = None
+        try:
+            with open(self.path, 'r') as f:
+                state = json.load(f)
+            self.inode, self.offset = state.get('inode'), int(state.get('offset', 0))
+            self.sealed_offset = state.get('sealed_offset')
+        except (OSError, ValueError):
+            pass
+
+    def read(self) -> Tuple[List[Dict], Tuple[Optional[int], int]]:
+        """Complete records after the cursor, and the position just past them"""
+        records: List[Dict] = []
+        sealed_end = self.sealed_offset
+        if sealed_end is not None and self.sealed_file.exists():
+            sealed_end = _read_records(self.sealed_file, sealed_end, records)
+
+        try:
+            stat = self.queue_file.stat()
+        except OSError:
+            return records, (sealed_end, self.offset)
+
+        if stat.st_ino != self.inode or stat.st_size < self.offset:
+            self.inode, self.offset = stat.st_ino, 0  # Replaced or truncated queue
+
+        return records, (sealed_end, _read_records(self.queue_file, self.offset, records))
+
+    def commit(self, position: Tuple[Optional[int], int]):
+        """Persist a position returned by read(); drop a drained sealed segment"""
+        self.sealed_offset, self.offset = position
+        if self.sealed_offset is not None:
+            try:
+                stat = self.sealed_file.stat()
+                if self.sealed_offset >= stat.st_size and time.time() - stat.st_mtime > SEAL_GRACE:
+                    os.unlink(self.sealed_file)
+                    self.sealed_offset = None
+            except OSError:
+                self.sealed_offset = None  # Already gone
+        self._save()
+
+    def backlog_bytes(self) -> int:
+        try:
+            return max(0, self.queue_file.stat().st_size - self.offset)
+        except OSError:
+            return 0
+
+    def rotate(self) -> bool:
+        """Seal the queue file if it is fully consumed and no sealed segment is pending"""
+        if self.sealed_offset is not None or self.offset == 0 or self.backlog_bytes():
+            return False
+        try:
+            os.rename(self.queue_file, self.sealed_file)
+        except OSError:
+            return False
+
+        self.sealed_offset, self.inode, self.offset = self.offset, None, 0
+        self._save()
+        return True
+
+    def _save(self):
+        """Write the state atomically"""
+        temp = self.path.with_name(self.path.name + '.tmp')
+        with open(temp, 'w') as f:
+            json.dump({'inode': self.inode, 'offset': self.offset, 'sealed_offset': self.sealed_offset}, f)
+        os.replace(temp, self.path)
+
+
+def _read_records(path: Path, offset: int, records: List[Dict]) -> int:
+    """Append complete JSON-object lines from offset to records; returns the offset past them"""
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b'\n'):
+                break  # Still being written
+            offset += len(line)
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict):
+                records.append(record)
+    return offset
@@ -0,0 +1,89 @@
+"""
+Read-Through Cache - Memoized Serena loads with negative caching and single-flight
+Concurrent loads of one key share a single request; misses are remembered for a short TTL
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+MISSING = object()
+
+
+class ReadThroughCache:
+    """LRU of loader results keyed by (namespace, key)
+
+    Hits are kept until evicted; a None result is a miss, remembered for
+    negative_ttl seconds so it is not requested again meanwhile. Misses are
+    kept in-process only: a persisted miss would hide an entry another
+    process writes later.
+    """
+
+    def __init__(self, loader: Callable[[Hashable], Optional[Any]], negative_ttl: float = 60,
+                 max_entries: int = 1024):
+        self.loader = loader
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.entries: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self.misses: Dict[Hashable, float] = {}  # key -> expiry
+        self.inflight: Dict[Hashable, threading.Event] = {}
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'negative_hits': 0, 'loads': 0, 'shared': 0}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Cached value, else one loader call shared by every concurrent caller"""
+        while True:
+            with self.lock:
+                value = self._lookup(key)
+                if value is not MISSING:
+                    return value
+
+                waiter = self.inflight.get(key)
+                if waiter is None:
+                    waiter = self.inflight[key] = threading.Event()
+                    break
+                self.stats['shared'] += 1
+
+            waiter.wait()  # Another thread is loading this key; then re-check
+
+        try:
+            with self.lock:
+                self.stats['loads'] += 1
+            value = self.loader(key)
+            self._store(key, value)
+            return value
+        finally:
+            with self.lock:
+                self.inflight.pop(key, None)
+            waiter.set()
+
+    def put(self, key: Hashable, value: Any):
+        """Record a known value (e.g. one just saved), clearing any remembered miss"""
+        self._store(key, value)
+
+    def _lookup(self, key: Hashable):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return self.entries[key]
+
+        expiry = self.misses.get(key)
+        if expiry is not None:
+            if expiry > time.time():
+                self.stats['negative_hits'] += 1
+                return None
+            del self.misses[key]
+        return MISSING
+
+    def _store(self, key: Hashable, value: Any):
+        with self.lock:
+            if value is None:
+                self.entries.pop(key, None)
+                self.misses[key] = time.time() + self.negative_ttl
+            else:
+                self.misses.pop(key, None)
+                self.entries[key] = value
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
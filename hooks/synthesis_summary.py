@@ -0,0 +1,143 @@
+"""
+Synthesis Summary - Mergeable counts behind an incremental or phase synthesis
+Final synthesis merges these per phase instead of rescanning every finding
+"""
+
+import uuid
+from typing import Dict, Iterable, Optional, Set
+
+from near_duplicates import NearDuplicateClusters
+
+CATEGORIES = ('patterns', 'issues', 'solutions')
+
+# Most frequent clusters kept per category when a summary is stored
+MAX_SUMMARY_CLUSTERS = 1000
+
+
+class SynthesisSummary:
+    """Near-duplicate clusters per category plus the totals confidence is computed from
+
+    Every count is also kept per task, so merging folds in only tasks this
+    summary has not counted yet: overlapping phases are never counted twice.
+    Findings without a task id are attributed to the summary that saw them.
+    """
+
+    def __init__(self, summary_id: Optional[str] = None):
+        self.id = summary_id or uuid.uuid4().hex
+        self.item_count = 0
+        self.task_ids: Set[str] = set()
+        self.clusters = {category: NearDuplicateClusters() for category in CATEGORIES}
+        self.entries = {category: 0 for category in CATEGORIES}
+        self.items_with = {category: 0 for category in CATEGORIES}  # Items with at least one entry
+        self.tasks: Dict[str, Dict] = {}  # task -> its items, entries and items_with
+        self.cluster_tasks = {category: {} for category in CATEGORIES}  # cluster index -> {task: count}
+        self.merged: Set[str] = {self.id}
+
+    @classmethod
+    def from_items(cls, items: Iterable[Dict]) -> 'SynthesisSummary':
+        summary = cls()
+        for item in items:
+            summary.add_item(item)
+        return summary
+
+    def add_item(self, item: Dict):
+        """Count one raw finding"""
+        task = str(item['task_id']) if item.get('task_id') else f"#{self.id}"
+        if item.get('task_id'):
+            self.task_ids.add(task)
+        stats = self.tasks.setdefault(task, _task_stats())
+        self.item_count += 1
+        stats['items'] += 1
+        for category in CATEGORIES:
+            entries = item.get(category) or []
+            if entries:
+                self.items_with[category] += 1
+                stats['items_with'][category] += 1
+            for entry in entries:
+                if isinstance(entry, dict):
+                    cluster = self.clusters[category].add(str(entry.get('content', '')))
+                    tally = self.cluster_tasks[category].setdefault(cluster, {})
+                    tally[task] = tally.get(task, 0) + 1
+                    self.entries[category] += 1
+                    stats['entries'][category] += 1
+
+    def covers(self, item: Dict) -> bool:
+        """True if the finding's task is already counted here"""
+        return bool(item.get('task_id')) and str(item['task_id']) in self.task_ids
+
+    def merge(self, other: 'SynthesisSummary') -> bool:
+        """Fold in another summary once; returns False if it was already merged"""
+        return self.merge_dict(other.to_dict())
+
+    def merge_dict(self, data: Dict) -> bool:
+        """merge() straight from a stored to_dict(), without rebuilding its clusters
+
+        Only tasks not counted here yet are added, with their own share of
+        every count and cluster.
+        """
+        merged = set(data.get('merged', [])) | {data.get('id')}
+        if merged & self.merged:
+            return False
+        self.merged |= merged
+
+        # Summaries stored without attribution count as one block of their own
+        block = f"#{data.get('id')}"
+        tasks = data.get('tasks') or {block: {'items': data.get('item_count', 0),
+                                              'entries': data.get('entries', {}),
+                                              'items_with': data.get('items_with', {})}}
+        new = {task: stats for task, stats in tasks.items() if task not in self.tasks}
+        for task, stats in new.items():
+            if not task.startswith('#'):
+                self.task_ids.add(task)
+            own = self.tasks[task] = _task_stats()
+            own['items'] = stats.get('items', 0)
+            self.item_count += own['items']
+            for category in CATEGORIES:
+                own['entries'][category] = stats.get('entries', {}).get(category, 0)
+                own['items_with'][category] = stats.get('items_with', {}).get(category, 0)
+                self.entries[category] += own['entries'][category]
+                self.items_with[category] += own['items_with'][category]
+
+        for category in CATEGORIES:
+            for cluster in data.get('clusters', {}).get(category, []):
+                shares = {task: count for task, count in (cluster.get('tasks') or {block: cluster['count']}).items()
+                          if task in new}
+                if not shares:
+                    continue
+                index = self.clusters[category].add(cluster['exemplar'], sum(shares.values()),
+                                                    cluster.get('fingerprint'))
+                tally = self.cluster_tasks[category].setdefault(index, {})
+                for task, count in shares.items():
+                    tally[task] = tally.get(task, 0) + count
+        return True
+
+    def to_dict(self) -> Dict:
+        clusters = {}
+        for category in CATEGORIES:
+            groups, tally = self.clusters[category], self.cluster_tasks[category]
+            clusters[category] = [{'exemplar': groups.exemplars[i], 'count': groups.counts[i],
+                                   'fingerprint': groups.fingerprints[i], 'tasks': tally.get(i, {})}
+                                  for i in groups.ranked(limit=MAX_SUMMARY_CLUSTERS)]
+        return {
+            'id': self.id,
+            'merged': sorted(self.merged),
+            'item_count': self.item_count,
+            'task_ids': sorted(self.task_ids),
+            'tasks': self.tasks,
+            'clusters': clusters,
+            'entries': dict(self.entries),
+            'items_with': dict(self.items_with)
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'SynthesisSummary':
+        summary = cls(data.get('id'))
+        summary.merged = set()
+        summary.merge_dict(data)
+        return summary
+
+
+def _task_stats() -> Dict:
+    return {'items': 0,
+            'entries': {category: 0 for category in CATEGORIES},
+            'items_with': {category: 0 for category in CATEGORIES}}
@@ -8,16 +8,41 @@ import json
 import os
 import sys
 import argparse
+import fcntl
 import subprocess
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple, Union
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from keyword_scanner import KeywordScanner, load_keywords
+from queue_cursor import QueueCursor
+from synthesis_summary import SynthesisSummary
+from read_through_cache import ReadThroughCache
+
+# Entry type recorded for each finding category
+FINDING_TYPES = {'patterns': 'detected', 'issues': 'identified', 'solutions': 'applied'}
+
+# Entries kept per category; later matches are only counted
+MAX_CATEGORY_ENTRIES = int(os.environ.get('SYNTHESIS_MAX_ENTRIES', '500'))
+
+# Threads that read and decode finding files; files handed to each thread at once
+LOAD_WORKERS = int(os.environ.get('SYNTHESIS_LOAD_WORKERS', str(min(32, (os.cpu_count() or 1) * 4))))
+LOAD_BATCH = 256
+
+# Seconds a Serena miss is remembered before another load is queued for it
+SERENA_NEGATIVE_TTL = float(os.environ.get('SERENA_NEGATIVE_TTL', '30'))
+
+# Raw outputs are read and scanned in newline-aligned blocks of about this size
+SCAN_CHUNK_BYTES = 8 * 1024 * 1024
 
 class AgentFindingsSynthesizer:
-    def __init__(self, temp_dir: str = '/tmp/claude_session', use_serena: bool = True):
+    def __init__(self, temp_dir: str = '/tmp/claude_session', use_serena: bool = True,
+                 keywords_file: Optional[str] = None):
         self.temp_dir = Path(temp_dir)
         self.use_serena = use_serena
+        self.scanner = KeywordScanner(load_keywords(keywords_file))
         
         # Temp paths for immediate capture
         self.temp_findings = self.temp_dir / 'findings'
@@ -27,6 +52,11 @@ class AgentFindingsSynthesizer:
         # Ensure temp directories exist
         for path in [self.temp_findings, self.temp_agents, self.temp_logs]:
             path.mkdir(parents=True, exist_ok=True)
+        
+        # Serena answers, shared by every load in this process
+        self.serena_cache_dir = self.temp_dir / 'serena_cache'
+        self.serena_cache = ReadThroughCache(
+            self._load_serena_entry, negative_ttl=SERENA_NEGATIVE_TTL)
     
     def save_to_serena(self, namespace: str, key: str, data: Any) -> bool:
         """Save data to Serena MCP memory"""
@@ -60,6 +90,7 @@ class AgentFindingsSynthesizer:
                     'params': mcp_request
                 }) + '\n')
             
+            self.serena_cache.put((namespace, key), data)
             return True
             
         except Exception as e:
@@ -76,30 +107,35 @@ class AgentFindingsSynthesizer:
             return None
         
         try:
-            # Queue MCP load request
-            mcp_queue = self.temp_dir / 'mcp_queue.jsonl'
-            with open(mcp_queue, 'a') as f:
-                f.write(json.dumps({
-                    'operation': 'load_memory',
-                    'server': 'serena',
-                    'params': {
-                        'namespace': namespace,
-                        'key': key
-                    }
-                }) + '\n')
-            
-            # For immediate needs, check temp cache
-            cache_file = self.temp_dir / 'serena_cache' / namespace / f"{key}.json"
-            if cache_file.exists():
-                with open(cache_file, 'r') as f:
-                    return json.load(f)
-            
-            return None
-            
+            return self.serena_cache.get((namespace, key))
         except Exception as e:
             self.log_error(f"Failed to load from Serena: {str(e)}")
             return None
     
+    def _load_serena_entry(self, entry: tuple) -> Optional[Dict]:
+        """Read-through loader: the local MCP cache, else queue a load from Serena"""
+        namespace, key = entry
+        cache_file = self.serena_cache_dir / namespace / f"{key}.json"
+        try:
+            with open(cache_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+        
+        # Genuine miss: process_mcp_queue.py writes the answer into serena_cache
+        mcp_queue = self.temp_dir / 'mcp_queue.jsonl'
+        with open(mcp_queue, 'a') as f:
+            f.write(json.dumps({
+                'operation': 'load_memory',
+                'server': 'serena',
+                'timestamp': datetime.now().isoformat(),
+                'params': {
+                    'namespace': namespace,
+                    'key': key
+                }
+            }) + '\n')
+        return None
+    
     def synthesize_immediate(self, task_id: str):
         """Immediate synthesis after a task completes"""
         try:
@@ -108,11 +144,8 @@ class AgentFindingsSynthesizer:
             if not raw_file.exists():
                 return
             
-            with open(raw_file, 'r') as f:
-                raw_output = f.read()
-            
-            # Extract patterns and insights
-            finding = self.extract_finding_from_output(raw_output, task_id)
+            # Extract patterns and insights (streamed - the file is never fully in memory)
+            finding = self.extract_finding_from_file(raw_file, task_id)
             
             if finding:
                 # Save to temp for batching
@@ -131,32 +164,32 @@ class AgentFindingsSynthesizer:
     def synthesize_incremental(self, agent_id: Optional[str] = None):
         """Incremental synthesis when subagents stop"""
         try:
-            # Get pending synthesis items
+            # Get pending synthesis items appended since the committed cursor
             pending_file = self.temp_findings / 'pending_synthesis.jsonl'
-            if not pending_file.exists():
+            if not pending_file.exists() and not pending_file.with_name(pending_file.name + '.sealed').exists():
                 return
             
-            pending_items = []
-            with open(pending_file, 'r') as f:
-                for line in f:
-                    try:
-                        pending_items.append(json.loads(line))
-                    except:
-                        continue
-            
-            if len(pending_items) >= 3:  # Batch threshold
-                # Group and synthesize
-                synthesis = self.create_incremental_synthesis(pending_items)
+            # One consumer at a time; a concurrent SubagentStop leaves the items to it
+            with open(pending_file.with_name(pending_file.name + '.lock'), 'w') as lock:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    return
                 
-                if synthesis:
-                    # Save to Serena
-                    synthesis_key = f"incremental_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-                    self.save_to_serena('synthesis', synthesis_key, synthesis)
-                    
-                    # Clear processed items
-                    open(pending_file, 'w').close()
+                cursor = QueueCursor(pending_file)
+                pending_items, position = cursor.read()
+                
+                if len(pending_items) >= 3:  # Batch threshold
+                    # Group and synthesize
+                    synthesis = self.create_incremental_synthesis(pending_items)
                     
-                    print(f"✓ Incremental synthesis completed ({len(pending_items)} items)")
+                    # Save to Serena, then mark the items consumed and retire the drained file
+                    synthesis_key = f"incremental_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+                    if synthesis and self.save_to_serena('synthesis', synthesis_key, synthesis):
+                        cursor.commit(position)
+                        cursor.rotate()
+                        
+                        print(f"✓ Incremental synthesis completed ({len(pending_items)} items)")
         
         except Exception as e:
             self.log_error(f"Incremental synthesis failed: {str(e)}")
@@ -165,11 +198,8 @@ class AgentFindingsSynthesizer:
         """Phase-level synthesis"""
         try:
             # Collect all findings from current phase
-            phase_findings = []
-            
-            for finding_file in self.temp_findings.glob("*.json"):
-                with open(finding_file, 'r') as f:
-                    phase_findings.append(json.load(f))
+            loaded = self.load_json_files(sorted(self.temp_findings.glob("*.json")))
+            phase_findings = [finding for _, finding in loaded]
             
             if not phase_findings:
                 return
@@ -179,16 +209,13 @@ class AgentFindingsSynthesizer:
             
             if phase_synthesis:
                 # Save to Serena
-                phase_key = f"phase_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+                phase_key = f"phase_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
                 self.save_to_serena('synthesis', phase_key, phase_synthesis)
                 
                 if consolidate:
-                    # Archive temp findings
-                    archive_dir = self.temp_dir / 'archived_phases'
-                    archive_dir.mkdir(exist_ok=True)
-                    
-                    for finding_file in self.temp_findings.glob("*.json"):
-                        finding_file.rename(archive_dir / finding_file.name)
+                    # Archive exactly the findings that went into this synthesis; skipped
+                    # (unreadable or half-written) files stay for the next run
+                    self.archive_files([path for path, _ in loaded], self.temp_dir / 'archived_phases')
                 
                 print(f"✓ Phase synthesis completed ({len(phase_findings)} findings)")
         
@@ -198,23 +225,18 @@ class AgentFindingsSynthesizer:
     def synthesize_final(self, session_id: str, output_path: Optional[str] = None):
         """Final synthesis for entire session"""
         try:
-            # Collect all synthesis results
-            all_syntheses = []
-            
-            # Load from Serena (check MCP cache)
+            # Earlier syntheses from Serena (check MCP cache)
+            syntheses = []
             cache_dir = self.temp_dir / 'serena_cache' / 'synthesis'
             if cache_dir.exists():
-                for cache_file in cache_dir.glob("*.json"):
-                    with open(cache_file, 'r') as f:
-                        all_syntheses.append(json.load(f))
+                syntheses = [doc for _, doc in self.load_json_files(sorted(cache_dir.glob("*.json")))]
             
-            # Add any remaining temp findings
-            for finding_file in self.temp_findings.glob("*.json"):
-                with open(finding_file, 'r') as f:
-                    all_syntheses.append(json.load(f))
+            # Merge their aggregates, plus any remaining temp findings they do not cover
+            findings = [doc for _, doc in self.load_json_files(sorted(self.temp_findings.glob("*.json")))]
+            aggregate = self.merge_syntheses(syntheses, findings)
             
             # Create final comprehensive synthesis
-            final_synthesis = self.create_final_synthesis(session_id, all_syntheses)
+            final_synthesis = self.create_final_synthesis(session_id, aggregate)
             
             if final_synthesis:
                 # Save to Serena with session context
@@ -237,187 +259,265 @@ class AgentFindingsSynthesizer:
                         json.dump(final_synthesis, f, indent=2)
                 
                 print(f"✓ Final synthesis for session {session_id} saved to Serena")
-                print(f"  - {len(all_syntheses)} total findings processed")
+                print(f"  - {aggregate.item_count} total findings processed")
                 print(f"  - {len(final_synthesis.get('recommendations', []))} recommendations")
                 print(f"  - {len(final_synthesis.get('patterns', []))} patterns identified")
         
         except Exception as e:
             self.log_error(f"Final synthesis failed: {str(e)}")
     
+    def load_json_files(self, paths: List[Path]) -> List[Tuple[Path, Any]]:
+        """(path, document) for each JSON file read on a bounded thread pool, in order
+
+        File reads release the GIL, so I/O of one batch overlaps decoding of another.
+        Unreadable or corrupt files are logged and skipped.
+        """
+        batches = [paths[i:i + LOAD_BATCH] for i in range(0, len(paths), LOAD_BATCH)]
+        if len(batches) <= 1:
+            loaded = [_read_json_batch(batch) for batch in batches]
+        else:
+            with ThreadPoolExecutor(max_workers=LOAD_WORKERS) as pool:
+                loaded = list(pool.map(_read_json_batch, batches))
+        
+        results = []
+        for batch, documents in zip(batches, loaded):
+            for path, document in zip(batch, documents):
+                if document is None:
+                    self.log_error(f"Skipped unreadable findings file {path}")
+                else:
+                    results.append((path, document))
+        return results
+    
+    def archive_files(self, paths: List[Path], archive_dir: Path):
+        """Move files into archive_dir, renaming in batches on the thread pool"""
+        archive_dir.mkdir(exist_ok=True)
+        batches = [paths[i:i + LOAD_BATCH] for i in range(0, len(paths), LOAD_BATCH)]
+        
+        def move(batch: List[Path]):
+            for path in batch:
+                try:
+                    os.rename(path, archive_dir / path.name)
+                except OSError:
+                    pass  # Already archived by a concurrent run
+        
+        if len(batches) <= 1:
+            for batch in batches:
+                move(batch)
+        else:
+            with ThreadPoolExecutor(max_workers=LOAD_WORKERS) as pool:
+                list(pool.map(move, batches))
+    
     def extract_finding_from_output(self, output: str, task_id: str) -> Dict:
         """Extract structured finding from agent output"""
-        finding = {
-            'task_id': task_id,
-            'timestamp': datetime.now().isoformat(),
-            'patterns': [],
-            'issues': [],
-            'solutions': [],
-            'insights': {}
-        }
-        
-        # Parse output for patterns (simplified - could use NLP)
-        lines = output.split('\n')
+        finding = self._new_finding(task_id)
         
-        for line in lines:
-            line_lower = line.lower()
-            
-            # Detect patterns
-            if any(keyword in line_lower for keyword in ['pattern', 'found', 'detected', 'identified']):
-                finding['patterns'].append({
-                    'type': 'detected',
-                    'content': line.strip()[:200]
-                })
-            
-            # Detect issues
-            if any(keyword in line_lower for keyword in ['error', 'issue', 'problem', 'warning']):
-                finding['issues'].append({
-                    'type': 'identified',
-                    'content': line.strip()[:200]
-                })
-            
-            # Detect solutions
-            if any(keyword in line_lower for keyword in ['fixed', 'resolved', 'solution', 'implemented']):
-                finding['solutions'].append({
-                    'type': 'applied',
-                    'content': line.strip()[:200]
-                })
+        # Classify keyword lines in a single regex pass over the output
+        self._add_lines(finding, self.scanner.scan(output))
         
         # Extract key insights
         if output:
             finding['insights']['summary'] = output[:500]
             finding['insights']['length'] = len(output)
         
+        return self._finish_finding(finding)
+    
+    def extract_finding_from_file(self, path: Path, task_id: str) -> Optional[Dict]:
+        """Extract a finding from a raw output file in constant memory"""
+        finding = self._new_finding(task_id)
+        length = 0
+        summary = ''
+        
+        with open(path, 'rb') as f:
+            for chunk in self._chunks(f):
+                self._add_lines(finding, self.scanner.scan(chunk))
+                
+                # Same figures text-mode reading would give (universal newlines)
+                text = chunk.decode('utf-8', errors='replace')
+                length += len(text) - text.count('\r\n')
+                if len(summary) < 500:
+                    summary = (summary + text[:1000].replace('\r\n', '\n').replace('\r', '\n'))[:500]
+        
+        if length == 0:
+            return None
+        finding['insights']['summary'] = summary
+        finding['insights']['length'] = length
+        
+        return self._finish_finding(finding)
+    
+    def _chunks(self, f):
+        """Newline-aligned blocks of about SCAN_CHUNK_BYTES (at most twice that)"""
+        carry = b''
+        while True:
+            block = f.read(SCAN_CHUNK_BYTES)
+            if not block:
+                if carry:
+                    yield carry
+                return
+            
+            data = carry + block
+            cut = data.rfind(b'\n') + 1
+            if cut == 0:
+                if len(data) < SCAN_CHUNK_BYTES:
+                    carry = data
+                    continue
+                # One very long line: pass it on in pieces so memory stays bounded,
+                # cutting between UTF-8 characters and never inside a \r\n
+                cut = len(data)
+                while cut > len(data) - 4 and data[cut - 1] & 0xC0 == 0x80:
+                    cut -= 1
+                if data[cut - 1] >= 0xC0 or data[cut - 1] == 0x0D:
+                    cut -= 1
+            yield data[:cut]
+            carry = data[cut:]
+    
+    def _new_finding(self, task_id: str) -> Dict:
+        return {
+            'task_id': task_id,
+            'timestamp': datetime.now().isoformat(),
+            'patterns': [],
+            'issues': [],
+            'solutions': [],
+            'insights': {'counts': defaultdict(int)}
+        }
+    
+    def _add_lines(self, finding: Dict, lines):
+        """Append classified lines, keeping at most MAX_CATEGORY_ENTRIES per category"""
+        counts = finding['insights']['counts']
+        for line, categories in lines:
+            content = None
+            for category in categories:
+                counts[category] += 1
+                if len(finding[category]) < MAX_CATEGORY_ENTRIES:
+                    content = content if content is not None else line.strip()[:200]
+                    finding[category].append({
+                        'type': FINDING_TYPES.get(category, 'detected'),
+                        'content': content
+                    })
+    
+    def _finish_finding(self, finding: Dict) -> Optional[Dict]:
+        """Drop empty findings; report totals only where entries were capped"""
+        counts = finding['insights'].pop('counts')
+        capped = {category: count for category, count in counts.items()
+                  if count > len(finding[category])}
+        if capped:
+            finding['insights']['total_matches'] = capped
+        
         return finding if (finding['patterns'] or finding['issues'] or finding['solutions']) else None
     
     def create_incremental_synthesis(self, items: List[Dict]) -> Dict:
         """Create synthesis from incremental items"""
+        aggregate = SynthesisSummary.from_items(items)
         return {
             'type': 'incremental',
             'timestamp': datetime.now().isoformat(),
             'item_count': len(items),
-            'patterns': self.extract_common_patterns(items),
-            'issues': self.extract_common_issues(items),
-            'solutions': self.combine_solutions(items)
+            'patterns': self.extract_common_patterns(aggregate),
+            'issues': self.extract_common_issues(aggregate),
+            'solutions': self.combine_solutions(aggregate),
+            'aggregate': aggregate.to_dict()
         }
     
     def create_phase_synthesis(self, findings: List[Dict]) -> Dict:
         """Create phase-level synthesis"""
+        aggregate = SynthesisSummary.from_items(findings)
         return {
             'type': 'phase',
             'timestamp': datetime.now().isoformat(),
             'finding_count': len(findings),
             'task_ids': [f.get('task_id') for f in findings if 'task_id' in f],
-            'patterns': self.extract_common_patterns(findings),
-            'issues': self.extract_common_issues(findings),
-            'solutions': self.combine_solutions(findings),
-            'confidence': self.calculate_confidence(findings)
+            'patterns': self.extract_common_patterns(aggregate),
+            'issues': self.extract_common_issues(aggregate),
+            'solutions': self.combine_solutions(aggregate),
+            'confidence': self.calculate_confidence(aggregate),
+            'aggregate': aggregate.to_dict()
         }
     
-    def create_final_synthesis(self, session_id: str, all_data: List[Dict]) -> Dict:
+    def create_final_synthesis(self, session_id: str, all_data: Union[List[Dict], SynthesisSummary]) -> Dict:
         """Create final comprehensive synthesis"""
-        patterns = self.extract_common_patterns(all_data)
-        issues = self.extract_common_issues(all_data)
-        solutions = self.combine_solutions(all_data)
+        aggregate = self._aggregate(all_data)
+        patterns = self.extract_common_patterns(aggregate)
+        issues = self.extract_common_issues(aggregate)
+        solutions = self.combine_solutions(aggregate)
         
         return {
             'type': 'final',
             'session_id': session_id,
             'timestamp': datetime.now().isoformat(),
-            'total_items': len(all_data),
+            'total_items': aggregate.item_count,
             'patterns': patterns,
             'issues': issues,
             'solutions': solutions,
             'recommendations': self.generate_recommendations(patterns, issues, solutions),
-            'confidence': self.calculate_confidence(all_data),
-            'summary': self.generate_summary(all_data)
+            'confidence': self.calculate_confidence(aggregate),
+            'summary': self.generate_summary(aggregate)
         }
     
-    def extract_common_patterns(self, items: List[Dict]) -> List[Dict]:
-        """Extract patterns that appear multiple times"""
-        all_patterns = []
-        for item in items:
-            if 'patterns' in item:
-                all_patterns.extend(item['patterns'])
+    def merge_syntheses(self, syntheses: List[Dict], findings: List[Dict]) -> SynthesisSummary:
+        """Merge the aggregates of earlier syntheses, then findings none of them covered
+
+        Cost grows with the number of syntheses and their cluster counts, not
+        with the findings behind them. Each aggregate is merged once and adds
+        only the tasks not counted yet, so overlapping phases are not double
+        counted; findings already counted by a merged aggregate are skipped.
+        """
+        aggregates = [synthesis['aggregate'] for synthesis in syntheses
+                      if synthesis.get('type') in ('incremental', 'phase') and synthesis.get('aggregate')]
         
-        # Count occurrences
-        pattern_counts = defaultdict(int)
-        for pattern in all_patterns:
-            pattern_key = str(pattern.get('content', ''))[:50]
-            pattern_counts[pattern_key] += 1
+        # Largest first, so a phase re-run over the same findings supersedes its earlier runs
+        merged = SynthesisSummary()
+        for data in sorted(aggregates, key=lambda data: -data.get('item_count', 0)):
+            merged.merge_dict(data)
         
-        # Return patterns that appear multiple times
-        common = []
-        for key, count in pattern_counts.items():
-            if count > 1:
-                common.append({
-                    'pattern': key,
-                    'frequency': count,
-                    'confidence': 'high' if count > 2 else 'medium'
-                })
+        for finding in findings:
+            if not merged.covers(finding):
+                merged.add_item(finding)
+        return merged
+    
+    def extract_common_patterns(self, items: Union[List[Dict], SynthesisSummary]) -> List[Dict]:
+        """Extract patterns that appear multiple times"""
+        clusters = self._aggregate(items).clusters['patterns']
         
-        return sorted(common, key=lambda x: x['frequency'], reverse=True)[:10]
+        # Return patterns that appear multiple times
+        return [{
+            'pattern': cluster['exemplar'],
+            'frequency': cluster['count'],
+            'confidence': 'high' if cluster['count'] > 2 else 'medium'
+        } for cluster in clusters.clusters(min_count=2, limit=10)]
     
-    def extract_common_issues(self, items: List[Dict]) -> List[Dict]:
+    def extract_common_issues(self, items: Union[List[Dict], SynthesisSummary]) -> List[Dict]:
         """Extract recurring issues"""
-        all_issues = []
-        for item in items:
-            if 'issues' in item:
-                all_issues.extend(item['issues'])
-        
-        issue_counts = defaultdict(int)
-        for issue in all_issues:
-            issue_key = str(issue.get('content', ''))[:50]
-            issue_counts[issue_key] += 1
-        
-        recurring = []
-        for key, count in issue_counts.items():
-            if count > 1:
-                recurring.append({
-                    'issue': key,
-                    'frequency': count,
-                    'severity': 'high' if count > 2 else 'medium'
-                })
+        clusters = self._aggregate(items).clusters['issues']
         
-        return recurring
+        return [{
+            'issue': cluster['exemplar'],
+            'frequency': cluster['count'],
+            'severity': 'high' if cluster['count'] > 2 else 'medium'
+        } for cluster in clusters.clusters(min_count=2)]
     
-    def combine_solutions(self, items: List[Dict]) -> List[Dict]:
+    def combine_solutions(self, items: Union[List[Dict], SynthesisSummary]) -> List[Dict]:
         """Combine and rank solutions"""
-        all_solutions = []
-        for item in items:
-            if 'solutions' in item:
-                all_solutions.extend(item['solutions'])
-        
-        # Group similar solutions
-        solution_groups = defaultdict(list)
-        for solution in all_solutions:
-            solution_key = str(solution.get('content', ''))[:30]
-            solution_groups[solution_key].append(solution)
-        
-        combined = []
-        for key, group in solution_groups.items():
-            combined.append({
-                'solution': key,
-                'occurrences': len(group),
-                'confidence': 'high' if len(group) > 1 else 'medium'
-            })
-        
-        return sorted(combined, key=lambda x: x['occurrences'], reverse=True)[:10]
+        clusters = self._aggregate(items).clusters['solutions']
+        
+        return [{
+            'solution': cluster['exemplar'],
+            'occurrences': cluster['count'],
+            'confidence': 'high' if cluster['count'] > 1 else 'medium'
+        } for cluster in clusters.clusters(limit=10)]
     
-    def calculate_confidence(self, items: List[Dict]) -> float:
+    def calculate_confidence(self, items: Union[List[Dict], SynthesisSummary]) -> float:
         """Calculate overall confidence score"""
-        if not items:
+        aggregate = self._aggregate(items)
+        if not aggregate.item_count:
             return 0.0
         
-        score = min(len(items) * 0.1, 0.5)  # More items = higher confidence
+        score = min(aggregate.item_count * 0.1, 0.5)  # More items = higher confidence
         
         # Check for patterns
-        has_patterns = any('patterns' in item and item['patterns'] for item in items)
-        if has_patterns:
+        if aggregate.items_with['patterns']:
             score += 0.2
         
         # Check for solutions
-        has_solutions = any('solutions' in item and item['solutions'] for item in items)
-        if has_solutions:
+        if aggregate.items_with['solutions']:
             score += 0.3
         
         return min(score, 1.0)
@@ -455,14 +555,15 @@ class AgentFindingsSynthesizer:
         
         return recommendations
     
-    def generate_summary(self, items: List[Dict]) -> str:
+    def generate_summary(self, items: Union[List[Dict], SynthesisSummary]) -> str:
         """Generate executive summary"""
-        task_count = len(set(item.get('task_id', '') for item in items if 'task_id' in item))
-        pattern_count = sum(len(item.get('patterns', [])) for item in items)
-        solution_count = sum(len(item.get('solutions', [])) for item in items)
+        aggregate = self._aggregate(items)
         
-        return (f"Processed {len(items)} findings from {task_count} tasks. "
-                f"Identified {pattern_count} patterns and {solution_count} solutions.")
+        return (f"Processed {aggregate.item_count} findings from {len(aggregate.task_ids)} tasks. "
+                f"Identified {aggregate.entries['patterns']} patterns and {aggregate.entries['solutions']} solutions.")
+    
+    def _aggregate(self, items: Union[List[Dict], SynthesisSummary]) -> SynthesisSummary:
+        return items if isinstance(items, SynthesisSummary) else SynthesisSummary.from_items(items)
     
     def queue_for_serena_save(self, namespace: str, key: str, data: Dict):
         """Queue data for Serena MCP save"""
@@ -481,6 +582,17 @@ class AgentFindingsSynthesizer:
         with open(error_log, 'a') as f:
             f.write(f"[{datetime.now().isoformat()}] {message}\n")
 
+def _read_json_batch(paths: List[Path]) -> List[Optional[Any]]:
+    """Decoded contents of each file, None where it could not be read"""
+    documents = []
+    for path in paths:
+        try:
+            with open(path, 'rb') as f:
+                documents.append(json.loads(f.read()))
+        except (OSError, ValueError):
+            documents.append(None)
+    return documents
+
 def main():
     parser = argparse.ArgumentParser(description='Synthesize agent findings')
     parser.add_argument('--mode', choices=['immediate', 'incremental', 'phase', 'final'],
@@ -497,12 +609,15 @@ def main():
     parser.add_argument('--consolidate', action='store_true',
                        help='Consolidate and archive after phase synthesis')
     parser.add_argument('--output', help='Output file path for final synthesis')
+    parser.add_argument('--keywords-file',
+                       help='JSON keyword sets per category (default .claude/synthesis_keywords.json)')
     
     args = parser.parse_args()
     
     synthesizer = AgentFindingsSynthesizer(
         temp_dir=args.temp_dir,
-        use_serena=args.use_serena
+        use_serena=args.use_serena,
+        keywords_file=args.keywords_file
     )
     
     if args.mode == 'immediate' and args.task_id: